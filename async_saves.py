@@ -0,0 +1,78 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Async Saves Module
+
+Name: Ajani Davis
+
+asyncio versions of the character_manager save functions so many game
+sessions can share one event loop. File work runs on a bounded thread
+pool, and saves and deletes of the same character are serialized with a
+per-character lock so two sessions never write one save at the same time.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from character_manager import (
+    format_save_data,
+    write_save_files,
+    load_character,
+    list_saved_characters,
+    delete_character
+)
+
+
+class AsyncSaveManager:
+    def __init__(self, save_directory="data/save_games", max_workers=8):
+        self.save_directory = save_directory
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.locks = {}
+
+    def lock_for(self, character_name):
+        lock = self.locks.get(character_name)
+        if lock is None:
+            lock = asyncio.Lock()
+            self.locks[character_name] = lock
+        return lock
+
+    async def run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    async def save_character(self, character):
+        name = character["name"]
+
+        # the text is built here on the event loop so the session can keep
+        # changing the character while the file is being written
+        try:
+            text = format_save_data(character)
+        except:
+            raise IOError("error saving character file")
+
+        async with self.lock_for(name):
+            return await self.run(write_save_files, [(name, text)], self.save_directory)
+
+    async def load_character(self, character_name):
+        # saves are replaced in one rename, so a load never sees half a write
+        return await self.run(load_character, character_name, self.save_directory)
+
+    async def load_characters(self, character_names):
+        """Load several characters at once, in the order given"""
+        return await asyncio.gather(*[self.load_character(name) for name in character_names])
+
+    async def list_saved_characters(self):
+        return await self.run(list_saved_characters, self.save_directory)
+
+    async def delete_character(self, character_name):
+        async with self.lock_for(character_name):
+            return await self.run(delete_character, character_name, self.save_directory)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        # waiting for the pool to finish must not block the event loop
+        await asyncio.to_thread(self.close)
@@ -0,0 +1,414 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Battle Simulator Module
+
+Name: Ajani Davis
+
+Runs large numbers of battles without any printing so class and enemy
+balance can be checked. All fights use the SimpleBattle rules from
+combat_system so the numbers match the real game.
+"""
+
+import math
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from combat_system import SimpleBattle, get_victory_rewards, use_special_ability
+from custom_exceptions import CharacterDeadError
+
+PLAYER_ACTIONS = ["attack", "special", "escape"]
+
+# a fight still going after this many turns is called a stalemate, e.g. a
+# cleric healing every turn against an enemy that hits for less than 30
+MAX_TURNS = 200
+
+# ---------------------------------------------------------
+# HEADLESS BATTLES
+# ---------------------------------------------------------
+
+class HeadlessBattle(SimpleBattle):
+    """SimpleBattle that never prints and can be reset and fought again"""
+
+    def __init__(self, character, enemy, action="attack", rng=None, max_turns=MAX_TURNS):
+        if action not in PLAYER_ACTIONS:
+            raise ValueError(f"unknown player action: {action}")
+
+        # scratch copies of only the fields the combat rules touch,
+        # made once so repeated fights never copy or change the originals
+        fighter = {
+            "class": character["class"],
+            "health": character["health"],
+            "max_health": character["max_health"],
+            "strength": character["strength"],
+            "magic": character["magic"]
+        }
+        opponent = {
+            "name": enemy["name"],
+            "health": enemy["health"],
+            "strength": enemy["strength"],
+            "xp_reward": enemy["xp_reward"],
+            "gold_reward": enemy["gold_reward"]
+        }
+        super().__init__(fighter, opponent)
+
+        self.action = action
+        self.max_turns = max_turns
+        self.rng = rng if rng is not None else random.Random()
+        self.start_health = character["health"]
+        self.enemy_start_health = enemy["health"]
+
+    def log(self, message):
+        # headless battles have no output
+        pass
+
+    def reset(self):
+        self.character["health"] = self.start_health
+        self.enemy["health"] = self.enemy_start_health
+        self.combat_active = True
+        self.turn = 1
+
+    def fight(self):
+        """
+        Fight one battle using the chosen player action every turn
+
+        Returns: "player", "enemy", "escaped" or "stalemate" (nobody won
+                 within max_turns turns)
+        Raises: CharacterDeadError if the character has no health
+        """
+        if self.character["health"] <= 0:
+            raise CharacterDeadError("character is already dead")
+
+        while self.turn <= self.max_turns:
+            # player turn (a failed escape uses up the turn)
+            if self.action == "escape":
+                if self.attempt_escape(self.rng):
+                    return "escaped"
+            elif self.action == "special":
+                use_special_ability(self.character, self.enemy, self.rng)
+            else:
+                self.player_turn()
+
+            winner = self.check_battle_end()
+            if winner:
+                return winner
+
+            # enemy turn
+            self.enemy_turn()
+            winner = self.check_battle_end()
+            if winner:
+                return winner
+
+            self.turn += 1
+
+        # turn is left one past the cap, so keep the last turn fought
+        self.turn = self.max_turns
+        return "stalemate"
+
+
+# ---------------------------------------------------------
+# BATCH SIMULATION
+# ---------------------------------------------------------
+
+def new_battle_stats():
+    return {
+        "battles": 0,
+        "wins": 0,
+        "losses": 0,
+        "escapes": 0,
+        "stalemates": 0,
+        "win_rate": 0.0,
+        "turns": {},
+        "player_health_remaining": {},
+        "enemy_health_remaining": {}
+    }
+
+
+def add_to_histogram(histogram, value, count=1):
+    histogram[value] = histogram.get(value, 0) + count
+
+
+def record_battle(stats, battle, winner):
+    stats["battles"] += 1
+    if winner == "player":
+        stats["wins"] += 1
+    elif winner == "enemy":
+        stats["losses"] += 1
+    elif winner == "stalemate":
+        stats["stalemates"] += 1
+    else:
+        stats["escapes"] += 1
+
+    # histograms are value -> how many battles ended that way
+    add_to_histogram(stats["turns"], battle.turn)
+    add_to_histogram(stats["player_health_remaining"], battle.character["health"])
+    add_to_histogram(stats["enemy_health_remaining"], battle.enemy["health"])
+
+
+def merge_battle_stats(total, part):
+    for key in ["battles", "wins", "losses", "escapes", "stalemates"]:
+        total[key] += part[key]
+
+    for key in ["turns", "player_health_remaining", "enemy_health_remaining"]:
+        for value, count in part[key].items():
+            add_to_histogram(total[key], value, count)
+
+    total["win_rate"] = total["wins"] / total["battles"] if total["battles"] else 0.0
+    return total
+
+
+def simulate_battles(character, enemy, num_battles=1000, action="attack", seed=None):
+    """
+    Fight the same character/enemy pair num_battles times with no output
+
+    Neither the character nor the enemy dictionary is changed. Plain
+    attacks are fully deterministic, so every fight ends the same way and
+    the outcome is worked out once with predict_battle. Special abilities
+    and escapes involve dice rolls and are fought out one by one using a
+    random.Random seeded with seed.
+
+    Returns: dictionary with battles, wins, losses, escapes, stalemates,
+             win_rate and histograms for turns, player_health_remaining and
+             enemy_health_remaining
+    Raises: CharacterDeadError if the character has no health
+    """
+    if num_battles < 1:
+        raise ValueError("num_battles must be at least 1")
+
+    stats = new_battle_stats()
+
+    if action == "attack":
+        outcome = predict_battle(character, enemy)
+        won = outcome["winner"] == "player"
+
+        stats["battles"] = num_battles
+        stats["wins"] = num_battles if won else 0
+        stats["losses"] = 0 if won else num_battles
+        stats["win_rate"] = 1.0 if won else 0.0
+        stats["turns"] = {outcome["turns"]: num_battles}
+        stats["player_health_remaining"] = {outcome["player_health"]: num_battles}
+        stats["enemy_health_remaining"] = {outcome["enemy_health"]: num_battles}
+        return stats
+
+    battle = HeadlessBattle(character, enemy, action, random.Random(seed))
+
+    for _ in range(num_battles):
+        battle.reset()
+        winner = battle.fight()
+        record_battle(stats, battle, winner)
+
+    stats["win_rate"] = stats["wins"] / stats["battles"]
+    return stats
+
+
+def predict_battle(character, enemy):
+    """
+    Work out the result of a plain-attack battle without fighting it
+
+    The player always strikes first and damage per hit never changes, so
+    each side needs a fixed number of hits and whoever needs fewer (the
+    player on a tie) wins.
+
+    Returns: dictionary with winner, turns, player_health, enemy_health,
+             xp_gained and gold_gained
+    Raises: CharacterDeadError if the character has no health
+    """
+    if character["health"] <= 0:
+        raise CharacterDeadError("character is already dead")
+
+    rules = SimpleBattle(None, None)
+    player_damage = rules.calculate_damage(character, enemy)
+    enemy_damage = rules.calculate_damage(enemy, character)
+
+    # hits needed to bring each side to zero (ceiling division)
+    player_hits = max(1, -(-enemy["health"] // player_damage))
+    enemy_hits = -(-character["health"] // enemy_damage)
+
+    if player_hits <= enemy_hits:
+        rewards = get_victory_rewards(enemy)
+        return {
+            "winner": "player",
+            "turns": player_hits,
+            "player_health": character["health"] - (player_hits - 1) * enemy_damage,
+            "enemy_health": 0,
+            "xp_gained": rewards["xp"],
+            "gold_gained": rewards["gold"]
+        }
+
+    return {
+        "winner": "enemy",
+        "turns": enemy_hits,
+        "player_health": 0,
+        "enemy_health": enemy["health"] - enemy_hits * player_damage,
+        "xp_gained": 0,
+        "gold_gained": 0
+    }
+
+
+# ---------------------------------------------------------
+# MONTE CARLO
+# ---------------------------------------------------------
+
+def simulate_chunk(task):
+    # runs inside a worker process, so it must be a top level function
+    character, enemy, num_battles, action, seed = task
+    return simulate_battles(character, enemy, num_battles, action, seed)
+
+
+def run_monte_carlo(character, enemy, num_battles=10000, action="special",
+                    seed=0, workers=None, chunk_size=1000):
+    """
+    Estimate battle outcomes involving dice rolls across several processes
+
+    The battles are split into chunks and every chunk gets its own seed
+    drawn from seed, so the result is the same no matter how many workers
+    run it or in what order the chunks finish.
+
+    Args:
+        character: Character dictionary
+        enemy: Enemy dictionary
+        num_battles: total battles to fight
+        action: "attack", "special" or "escape" used every player turn
+        seed: master seed for the run
+        workers: number of processes (None uses every core, 1 runs here)
+        chunk_size: battles per chunk
+
+    Returns: merged battle stats plus win_rate_interval, mean_turns and
+             mean_turns_interval (95 percent confidence)
+    Raises: CharacterDeadError if the character has no health
+    """
+    if num_battles < 1:
+        raise ValueError("num_battles must be at least 1")
+    if character["health"] <= 0:
+        raise CharacterDeadError("character is already dead")
+
+    # workers only need the fields a battle reads
+    fighter = {key: character[key] for key in ["class", "health", "max_health", "strength", "magic"]}
+    opponent = {key: enemy[key] for key in ["name", "health", "strength", "xp_reward", "gold_reward"]}
+
+    master = random.Random(seed)
+    tasks = []
+    remaining = num_battles
+    while remaining > 0:
+        count = min(chunk_size, remaining)
+        tasks.append((fighter, opponent, count, action, master.getrandbits(64)))
+        remaining -= count
+
+    if workers == 1:
+        parts = map(simulate_chunk, tasks)
+        return add_confidence_intervals(merge_all(parts))
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parts = pool.map(simulate_chunk, tasks)
+        return add_confidence_intervals(merge_all(parts))
+
+
+def merge_all(parts):
+    total = new_battle_stats()
+    for part in parts:
+        merge_battle_stats(total, part)
+    return total
+
+
+def add_confidence_intervals(stats, z=1.96):
+    n = stats["battles"]
+    p = stats["wins"] / n
+
+    # wilson score interval stays inside 0..1 even for rates near 0 or 1
+    center = (p + z * z / (2 * n)) / (1 + z * z / n)
+    spread = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+    stats["win_rate_interval"] = (max(0.0, center - spread), min(1.0, center + spread))
+
+    total = 0
+    total_sq = 0
+    for turns, count in stats["turns"].items():
+        total += turns * count
+        total_sq += turns * turns * count
+
+    mean = total / n
+    variance = max(0.0, total_sq / n - mean * mean)
+    error = z * math.sqrt(variance / n)
+    stats["mean_turns"] = mean
+    stats["mean_turns_interval"] = (mean - error, mean + error)
+
+    return stats
+
+
+# ---------------------------------------------------------
+# LANE SIMULATION
+# ---------------------------------------------------------
+
+def simulate_battle_lanes(pairs):
+    """
+    Fight many different character/enemy pairs side by side
+
+    Every pair is one lane. Health and damage for all lanes are kept in
+    parallel lists and each step advances every unfinished lane by one
+    turn, so finished fights drop out instead of being checked again.
+
+    Args:
+        pairs: list of (character, enemy) tuples
+
+    Returns: list of result dictionaries in the same order as pairs, each
+             the same as SimpleBattle.start_battle would return
+    Raises: CharacterDeadError if any character has no health
+    """
+    rules = SimpleBattle(None, None)
+
+    player_health = []
+    enemy_health = []
+    player_damage = []
+    enemy_damage = []
+
+    for character, enemy in pairs:
+        if character["health"] <= 0:
+            raise CharacterDeadError("character is already dead")
+        player_health.append(character["health"])
+        enemy_health.append(enemy["health"])
+        # strength never changes during a plain battle so damage is fixed
+        player_damage.append(rules.calculate_damage(character, enemy))
+        enemy_damage.append(rules.calculate_damage(enemy, character))
+
+    winners = [None] * len(pairs)
+    active = list(range(len(pairs)))
+
+    while active:
+        still_fighting = []
+
+        for lane in active:
+            # player turn
+            hp = enemy_health[lane] - player_damage[lane]
+            if hp <= 0:
+                enemy_health[lane] = 0
+                winners[lane] = "player"
+                continue
+            enemy_health[lane] = hp
+
+            # enemy turn
+            hp = player_health[lane] - enemy_damage[lane]
+            if hp <= 0:
+                player_health[lane] = 0
+                winners[lane] = "enemy"
+                continue
+            player_health[lane] = hp
+
+            still_fighting.append(lane)
+
+        active = still_fighting
+
+    results = []
+    for lane, (character, enemy) in enumerate(pairs):
+        if winners[lane] == "player":
+            rewards = get_victory_rewards(enemy)
+            results.append({
+                "winner": "player",
+                "xp_gained": rewards["xp"],
+                "gold_gained": rewards["gold"]
+            })
+        else:
+            results.append({
+                "winner": "enemy",
+                "xp_gained": 0,
+                "gold_gained": 0
+            })
+
+    return results
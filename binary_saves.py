@@ -0,0 +1,271 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Binary Saves Module
+
+Name: Ajani Davis
+
+Compact binary version of the character save file. Every save starts with
+a header (magic bytes and a format version) so older saves can still be
+read after the format changes. A binary save is a faster-loading copy of
+the text save, which is still the character's real save.
+
+Version 1 layout (little endian):
+    header      4s magic, H version
+    name, class strings
+    stats       7 signed 64-bit ints (level, health, max_health,
+                strength, magic, experience, gold)
+    inventory   string list of item IDs, then one I count per item ID
+    quests      string list of active quests, then of completed quests
+    equipment   B flags, then each equipment field whose flag bit is set
+
+Strings are an H byte length followed by UTF-8 bytes. A string list is an
+I entry count and an I byte length followed by the entries joined with
+NUL bytes, so a whole list is decoded with one decode and one split.
+"""
+
+import os
+import struct
+
+from custom_exceptions import SaveFileCorruptedError
+from character_manager import (
+    Character,
+    QuestLog,
+    EQUIPMENT_FIELDS,
+    save_character,
+    load_character,
+    list_saved_characters,
+    delete_character,
+    write_temp_file,
+    sync_directory
+)
+from inventory_system import Inventory
+
+MAGIC = b"QCSV"
+FORMAT_VERSION = 1
+
+HEADER = struct.Struct("<4sH")
+STATS = struct.Struct("<7q")
+LENGTH = struct.Struct("<H")
+FLAGS = struct.Struct("<B")
+LIST_HEADER = struct.Struct("<II")
+
+STAT_FIELDS = ["level", "health", "max_health", "strength", "magic", "experience", "gold"]
+
+
+# ============================================================================
+# ENCODING
+# ============================================================================
+
+def encode_character(character):
+    """Return the binary save bytes for a character"""
+    parts = [HEADER.pack(MAGIC, FORMAT_VERSION)]
+
+    add_string(parts, character["name"])
+    add_string(parts, character["class"])
+    parts.append(STATS.pack(*[character[field] for field in STAT_FIELDS]))
+
+    inventory = character["inventory"]
+    if isinstance(inventory, Inventory):
+        stacks = inventory.counts
+    else:
+        stacks = Inventory(inventory).counts
+
+    add_string_list(parts, stacks.keys())
+    parts.append(struct.pack(f"<{len(stacks)}I", *stacks.values()))
+
+    add_string_list(parts, character["active_quests"])
+    add_string_list(parts, character["completed_quests"])
+
+    # one bit per equipment field that is set
+    flags = 0
+    present = []
+    for bit, field in enumerate(EQUIPMENT_FIELDS):
+        value = character.get(field)
+        if value is not None:
+            flags |= 1 << bit
+            present.append(value)
+
+    parts.append(FLAGS.pack(flags))
+    for value in present:
+        add_string(parts, value)
+
+    return b"".join(parts)
+
+
+def add_string(parts, text):
+    data = text.encode("utf-8")
+    parts.append(LENGTH.pack(len(data)))
+    parts.append(data)
+
+
+def add_string_list(parts, texts):
+    texts = list(texts)
+    data = "\0".join(texts).encode("utf-8")
+    parts.append(LIST_HEADER.pack(len(texts), len(data)))
+    parts.append(data)
+
+
+# ============================================================================
+# DECODING
+# ============================================================================
+
+def decode_character(data):
+    """
+    Build a Character from binary save bytes
+
+    Raises: SaveFileCorruptedError if the data is not a readable save
+    """
+    try:
+        magic, version = HEADER.unpack_from(data, 0)
+    except struct.error:
+        raise SaveFileCorruptedError("save data is too short")
+
+    if magic != MAGIC:
+        raise SaveFileCorruptedError("not a binary save file")
+
+    decoder = DECODERS.get(version)
+    if decoder is None:
+        raise SaveFileCorruptedError(f"unknown save format version: {version}")
+
+    try:
+        return decoder(data, HEADER.size)
+    except (struct.error, UnicodeDecodeError, IndexError):
+        raise SaveFileCorruptedError("save data is damaged")
+
+
+def decode_version_1(data, offset):
+    # slots are set directly, skipping the dictionary style key lookup
+    character = Character()
+
+    character.name, offset = read_string(data, offset)
+    character.character_class, offset = read_string(data, offset)
+
+    (character.level, character.health, character.max_health, character.strength,
+     character.magic, character.experience, character.gold) = STATS.unpack_from(data, offset)
+    offset += STATS.size
+
+    item_ids, offset = read_string_list(data, offset)
+    counts = struct.unpack_from(f"<{len(item_ids)}I", data, offset)
+    offset += 4 * len(item_ids)
+
+    inventory = Inventory()
+    inventory.counts = dict(zip(item_ids, counts))
+    inventory.size = sum(counts)
+    character.inventory = inventory
+
+    active, offset = read_string_list(data, offset)
+    completed, offset = read_string_list(data, offset)
+    character.active_quests = QuestLog(active)
+    character.completed_quests = QuestLog(completed)
+
+    (flags,) = FLAGS.unpack_from(data, offset)
+    offset += FLAGS.size
+    for bit, field in enumerate(EQUIPMENT_FIELDS):
+        if flags & (1 << bit):
+            character[field], offset = read_string(data, offset)
+
+    if offset != len(data):
+        raise SaveFileCorruptedError("unexpected data at end of save")
+
+    return character
+
+
+def read_string(data, offset):
+    (length,) = LENGTH.unpack_from(data, offset)
+    offset += LENGTH.size
+    end = offset + length
+    if end > len(data):
+        raise IndexError("string runs past end of save")
+    return bytes(data[offset:end]).decode("utf-8"), end
+
+
+def read_string_list(data, offset):
+    count, length = LIST_HEADER.unpack_from(data, offset)
+    offset += LIST_HEADER.size
+    end = offset + length
+    if end > len(data):
+        raise IndexError("list runs past end of save")
+    if count == 0:
+        return [], end
+
+    texts = bytes(data[offset:end]).decode("utf-8").split("\0")
+    if len(texts) != count:
+        raise SaveFileCorruptedError("list has the wrong number of entries")
+    return texts, end
+
+
+# version number -> function that reads the body after the header
+DECODERS = {
+    1: decode_version_1
+}
+
+
+# ============================================================================
+# SAVE FILES
+# ============================================================================
+
+def binary_save_path(character_name, save_directory):
+    return os.path.join(save_directory, f"{character_name}_save.dat")
+
+
+# the text save stays the character's real save, because the game, the
+# index and the other save tools all read it. the .dat file is a faster copy
+# of it: every text save write deletes the copy, so a .dat that exists
+# always matches the text save and is the one loaded.
+
+def save_character_binary(character, save_directory="data/save_games"):
+    """Save the text save, then its binary copy"""
+    save_character(character, save_directory)
+    write_binary_copy(character, save_directory)
+    return True
+
+
+def write_binary_copy(character, save_directory):
+    try:
+        data = encode_character(character)
+        filename = binary_save_path(character["name"], save_directory)
+        temp_name = write_temp_file(save_directory, data, filename)
+        os.replace(temp_name, filename)
+        sync_directory(save_directory)
+    except (OSError, struct.error, AttributeError, TypeError):
+        raise IOError("error saving character file")
+
+
+def load_character_binary(character_name, save_directory="data/save_games"):
+    """
+    Load a character from its binary save
+
+    A character without a binary copy (its text save was written since the
+    last binary save) is loaded from the text save and a copy is written,
+    so the next load takes the binary path.
+    """
+    filename = binary_save_path(character_name, save_directory)
+
+    try:
+        with open(filename, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        character = load_character(character_name, save_directory)
+        write_binary_copy(character, save_directory)
+        return character
+    except OSError:
+        raise SaveFileCorruptedError("could not read save file")
+
+    return decode_character(data)
+
+
+def delete_character_binary(character_name, save_directory="data/save_games"):
+    # delete_character removes the binary save along with the text save
+    return delete_character(character_name, save_directory)
+
+
+def migrate_save_directory(save_directory="data/save_games"):
+    """Write a binary copy for every text save that does not have one"""
+    migrated = 0
+    for name in list_saved_characters(save_directory):
+        if os.path.exists(binary_save_path(name, save_directory)):
+            continue
+        write_binary_copy(load_character(name, save_directory), save_directory)
+        migrated += 1
+
+    return migrated
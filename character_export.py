@@ -0,0 +1,103 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Character Export Module
+
+Name: Ajani Davis
+
+Moves characters in and out of a save directory in bulk. Export writes
+every save into one CSV file with a column per save field, and import
+reads that file back a batch of rows at a time, checks every character
+with validate_character_data, and writes each batch with save_characters.
+Both directions stream, so only one batch of characters is ever held in
+memory.
+"""
+
+import csv
+import os
+
+from custom_exceptions import InvalidSaveDataError
+from character_manager import (
+    SAVE_FIELDS,
+    load_character,
+    parse_save_data,
+    save_characters
+)
+
+
+def export_characters(export_file, save_directory="data/save_games"):
+    """
+    Write every saved character in save_directory to one CSV file
+
+    List fields are stored the same way as in a save file (comma separated).
+
+    Returns: number of characters exported
+    """
+    count = 0
+
+    with open(export_file, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(SAVE_FIELDS)
+
+        if os.path.exists(save_directory):
+            with os.scandir(save_directory) as entries:
+                for entry in entries:
+                    if not entry.name.endswith("_save.txt"):
+                        continue
+
+                    character = load_character(entry.name[:-len("_save.txt")], save_directory)
+                    writer.writerow([export_value(character[field]) for field in SAVE_FIELDS])
+                    count += 1
+
+    return count
+
+
+def export_value(value):
+    if isinstance(value, (str, int)):
+        return value
+    return ",".join(value)
+
+
+def iter_exported_characters(export_file, batch_size=1000):
+    """
+    Read an export file and yield lists of up to batch_size characters
+
+    Raises: InvalidSaveDataError for a bad header or a bad row
+    """
+    with open(export_file, "r", newline="") as f:
+        reader = csv.reader(f)
+
+        header = next(reader, None)
+        if header != SAVE_FIELDS:
+            raise InvalidSaveDataError("export file has the wrong columns")
+
+        batch = []
+        for row_number, row in enumerate(reader, 2):
+            if len(row) != len(SAVE_FIELDS):
+                raise InvalidSaveDataError(f"row {row_number} has the wrong number of columns")
+
+            # rebuild save file lines so the normal parser and validation run
+            lines = [f"{field.upper()}: {value}" for field, value in zip(SAVE_FIELDS, row)]
+            try:
+                batch.append(parse_save_data(lines))
+            except InvalidSaveDataError as e:
+                raise InvalidSaveDataError(f"row {row_number}: {e}")
+
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+
+        if batch:
+            yield batch
+
+
+def import_characters(export_file, save_directory="data/save_games", batch_size=1000):
+    """
+    Save every character in an export file into save_directory
+
+    Returns: number of characters imported
+    """
+    count = 0
+    for batch in iter_exported_characters(export_file, batch_size):
+        save_characters(batch, save_directory)
+        count += len(batch)
+    return count
@@ -10,13 +10,173 @@ This module handles character creation, loading, and saving.
 """
 
 import os
+import io
+import csv
+import math
+import time
+import tempfile
+import threading
+import weakref
 from custom_exceptions import (
     InvalidCharacterClassError,
     CharacterNotFoundError,
     SaveFileCorruptedError,
     InvalidSaveDataError,
+    MissingSaveFieldError,
+    InvalidSaveFieldTypeError,
     CharacterDeadError
 )
+from inventory_system import Inventory
+
+# quest ids kept in the order they were added, with set speed lookups
+class QuestLog:
+    __slots__ = ("ids",)
+
+    def __init__(self, quest_ids=()):
+        self.ids = dict.fromkeys(quest_ids)
+
+    def append(self, quest_id):
+        # a quest can only be in the log once
+        self.ids[quest_id] = None
+
+    def add(self, quest_id):
+        self.ids[quest_id] = None
+
+    def extend(self, quest_ids):
+        for quest_id in quest_ids:
+            self.ids[quest_id] = None
+
+    def remove(self, quest_id):
+        if quest_id not in self.ids:
+            raise ValueError(f"{quest_id} not in quest log")
+        del self.ids[quest_id]
+
+    def discard(self, quest_id):
+        self.ids.pop(quest_id, None)
+
+    def count(self, quest_id):
+        return 1 if quest_id in self.ids else 0
+
+    def clear(self):
+        self.ids.clear()
+
+    def copy(self):
+        return list(self.ids)
+
+    def __contains__(self, quest_id):
+        return quest_id in self.ids
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def __eq__(self, other):
+        if isinstance(other, QuestLog):
+            return list(self.ids) == list(other.ids)
+        if isinstance(other, list):
+            return list(self.ids) == other
+        return NotImplemented
+
+    def __repr__(self):
+        return f"QuestLog({list(self.ids)!r})"
+
+
+# every key a character can have, mapped to the attribute that stores it
+# ("class" is a python keyword so it cannot be an attribute name)
+CHARACTER_KEYS = {
+    "name": "name",
+    "class": "character_class",
+    "level": "level",
+    "health": "health",
+    "max_health": "max_health",
+    "strength": "strength",
+    "magic": "magic",
+    "experience": "experience",
+    "gold": "gold",
+    "inventory": "inventory",
+    "active_quests": "active_quests",
+    "completed_quests": "completed_quests",
+    "equipped_weapon": "equipped_weapon",
+    "equipped_weapon_effect": "equipped_weapon_effect",
+    "equipped_armor": "equipped_armor",
+    "equipped_armor_effect": "equipped_armor_effect"
+}
+
+
+# fields written to a save file, in save file order
+SAVE_FIELDS = [
+    "name", "class", "level", "health", "max_health",
+    "strength", "magic", "experience", "gold",
+    "inventory", "active_quests", "completed_quests"
+]
+
+# optional fields written after SAVE_FIELDS, only while something is equipped
+EQUIPMENT_FIELDS = [
+    "equipped_weapon", "equipped_weapon_effect",
+    "equipped_armor", "equipped_armor_effect"
+]
+
+
+# compact character record that is used like the old character dictionary
+class Character:
+    __slots__ = tuple(CHARACTER_KEYS.values())
+
+    def __init__(self, fields=None):
+        if fields is not None:
+            for key, value in fields.items():
+                # keys this record does not know about are dropped
+                if key in CHARACTER_KEYS:
+                    setattr(self, CHARACTER_KEYS[key], value)
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, CHARACTER_KEYS[key])
+        except (KeyError, AttributeError):
+            raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key not in CHARACTER_KEYS:
+            raise KeyError(key)
+        setattr(self, CHARACTER_KEYS[key], value)
+
+    def __delitem__(self, key):
+        try:
+            delattr(self, CHARACTER_KEYS[key])
+        except (KeyError, AttributeError):
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in CHARACTER_KEYS and hasattr(self, CHARACTER_KEYS[key])
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return [key for key, slot in CHARACTER_KEYS.items() if hasattr(self, slot)]
+
+    def values(self):
+        return [self[key] for key in self.keys()]
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def __repr__(self):
+        return f"Character({self.to_dict()!r})"
+
 
 # basic character creation
 def create_character(name, character_class):
@@ -34,7 +194,7 @@ def create_character(name, character_class):
 
     stats = class_stats[character_class]
 
-    character = {
+    character = Character({
         "name": name,
         "class": character_class,
         "level": 1,
@@ -44,45 +204,109 @@ def create_character(name, character_class):
         "magic": stats["magic"],
         "experience": 0,
         "gold": 100,
-        "inventory": [],
-        "active_quests": [],
-        "completed_quests": []
-    }
+        "inventory": Inventory(),
+        "active_quests": QuestLog(),
+        "completed_quests": QuestLog()
+    })
 
     return character
 
 
 # saving a character to file
 def save_character(character, save_directory="data/save_games"):
+    return save_characters([character], save_directory)
+
+
+# saving many characters as one batch
+def save_characters(characters, save_directory="data/save_games"):
+    try:
+        saves = [(character["name"], format_save_data(character)) for character in characters]
+    except:
+        raise IOError("error saving character file")
+
+    return write_save_files(saves, save_directory)
+
+
+# write already formatted (name, save text) pairs as one batch
+def write_save_files(saves, save_directory="data/save_games"):
     if not os.path.exists(save_directory):
         os.makedirs(save_directory)
 
-    filename = os.path.join(save_directory, f"{character['name']}_save.txt")
-
+    # each save goes to a temp file first and is renamed over the real file
+    # only once it is fully on disk, so a crash never leaves half a save
+    pending = []
     try:
-        with open(filename, "w") as f:
-            f.write(f"NAME: {character['name']}\n")
-            f.write(f"CLASS: {character['class']}\n")
-            f.write(f"LEVEL: {character['level']}\n")
-            f.write(f"HEALTH: {character['health']}\n")
-            f.write(f"MAX_HEALTH: {character['max_health']}\n")
-            f.write(f"STRENGTH: {character['strength']}\n")
-            f.write(f"MAGIC: {character['magic']}\n")
-            f.write(f"EXPERIENCE: {character['experience']}\n")
-            f.write(f"GOLD: {character['gold']}\n")
-
-            inv = ",".join(character["inventory"])
-            active = ",".join(character["active_quests"])
-            done = ",".join(character["completed_quests"])
-
-            f.write(f"INVENTORY: {inv}\n")
-            f.write(f"ACTIVE_QUESTS: {active}\n")
-            f.write(f"COMPLETED_QUESTS: {done}\n")
+        for name, text in saves:
+            filename = os.path.join(save_directory, f"{name}_save.txt")
+            pending.append((write_temp_file(save_directory, text, filename), filename))
 
-        return True
+        for temp_name, filename in pending:
+            os.replace(temp_name, filename)
+
+        # a binary save from binary_saves is only a copy of the text save,
+        # so once the text save changes the copy is out of date
+        for name, text in saves:
+            try:
+                os.remove(os.path.join(save_directory, f"{name}_save.dat"))
+            except FileNotFoundError:
+                pass
+
+        sync_directory(save_directory)
     except:
+        for temp_name, filename in pending:
+            if os.path.exists(temp_name):
+                os.remove(temp_name)
         raise IOError("error saving character file")
 
+    saved_at = time.time()
+    record_summaries(save_directory, [summary_from_save_text(text, saved_at) for name, text in saves])
+    return True
+
+
+# the process umask, read once at import because reading it means setting it
+def read_umask():
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+UMASK = read_umask()
+
+
+# write text to a hidden temp file in folder and fsync it, returns the temp path.
+# mkstemp makes the file 0600, so it gets the permissions of the file it will
+# replace (target), or what open() would give a new file
+def write_temp_file(folder, content, target=None):
+    fd, temp_name = tempfile.mkstemp(dir=folder, prefix=".", suffix=".tmp")
+    mode = "wb" if isinstance(content, bytes) else "w"
+    try:
+        if os.name != "nt":
+            try:
+                permissions = os.stat(target).st_mode & 0o777
+            except (OSError, TypeError):
+                permissions = 0o666 & ~UMASK
+            os.fchmod(fd, permissions)
+
+        with os.fdopen(fd, mode) as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+    except:
+        os.remove(temp_name)
+        raise
+    return temp_name
+
+
+# make renames in a folder durable (not supported on windows)
+def sync_directory(folder):
+    if os.name == "nt":
+        return
+    fd = os.open(folder, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
 
 # loading a character
 def load_character(character_name, save_directory="data/save_games"):
@@ -97,6 +321,49 @@ def load_character(character_name, save_directory="data/save_games"):
     except:
         raise SaveFileCorruptedError("could not read save file")
 
+    return parse_save_data(lines)
+
+
+# save file text for a character
+def format_save_data(character):
+    inv = ",".join(character["inventory"])
+    active = ",".join(character["active_quests"])
+    done = ",".join(character["completed_quests"])
+
+    text = (
+        f"NAME: {character['name']}\n"
+        f"CLASS: {character['class']}\n"
+        f"LEVEL: {character['level']}\n"
+        f"HEALTH: {character['health']}\n"
+        f"MAX_HEALTH: {character['max_health']}\n"
+        f"STRENGTH: {character['strength']}\n"
+        f"MAGIC: {character['magic']}\n"
+        f"EXPERIENCE: {character['experience']}\n"
+        f"GOLD: {character['gold']}\n"
+        f"INVENTORY: {inv}\n"
+        f"ACTIVE_QUESTS: {active}\n"
+        f"COMPLETED_QUESTS: {done}\n"
+    )
+
+    for field in EQUIPMENT_FIELDS:
+        value = character.get(field)
+        if value is not None:
+            text += f"{field.upper()}: {value}\n"
+
+    return text
+
+
+# turn save file lines back into a validated character
+def parse_save_data(lines):
+    character = parse_save_lines(lines)
+
+    validate_character_data(character)
+
+    return Character(character)
+
+
+# turn save file lines into a plain dictionary of typed values
+def parse_save_lines(lines):
     character = {}
 
     for line in lines:
@@ -113,7 +380,7 @@ def load_character(character_name, save_directory="data/save_games"):
             try:
                 value = int(value)
             except:
-                raise InvalidSaveDataError(f"invalid number for {key}")
+                raise InvalidSaveFieldTypeError(f"invalid number for {key}")
 
         elif key in ["inventory", "active_quests", "completed_quests"]:
             if value == "":
@@ -121,13 +388,21 @@ def load_character(character_name, save_directory="data/save_games"):
             else:
                 value = value.split(",")
 
-        character[key] = value
+            if key == "inventory":
+                value = Inventory(value)
+            else:
+                value = QuestLog(value)
 
-    validate_character_data(character)
+        character[key] = value
 
     return character
 
 
+# the small fields at the top of a save, and the list fields after them
+HEADER_FIELDS = ["name", "class", "level", "health", "max_health", "strength", "magic", "experience", "gold"]
+LIST_FIELDS = ["inventory", "active_quests", "completed_quests"]
+
+
 # list of saves
 def list_saved_characters(save_directory="data/save_games"):
     if not os.path.exists(save_directory):
@@ -145,41 +420,470 @@ def list_saved_characters(save_directory="data/save_games"):
 def delete_character(character_name, save_directory="data/save_games"):
     filename = os.path.join(save_directory, f"{character_name}_save.txt")
 
-    if not os.path.exists(filename):
+    # a pending write-behind save would bring the character back
+    for cache in list(save_caches):
+        if os.path.abspath(cache.save_directory) == os.path.abspath(save_directory):
+            cache.forget(character_name)
+
+    # the binary save from binary_saves goes too, or it would still load
+    filenames = [filename, os.path.join(save_directory, f"{character_name}_save.dat")]
+    filenames = [name for name in filenames if os.path.exists(name)]
+
+    if not filenames:
         raise CharacterNotFoundError(f"no save file for: {character_name}")
 
     try:
-        os.remove(filename)
+        for name in filenames:
+            os.remove(name)
     except:
         raise SaveFileCorruptedError("could not delete save file")
 
+    record_deletion(save_directory, character_name)
     return True
 
 
+# ============================================================================
+# CHARACTER SUMMARY INDEX
+# ============================================================================
+# a small side file with the name, class, level, gold and save time of every
+# saved character, so menus and rankings never have to open the saves.
+# every save and delete appends one row; the file is rewritten with only the
+# live rows once it has grown to COMPACT_RATIO times the number of characters.
+
+INDEX_FILE = "character_index.csv"
+SUMMARY_FIELDS = ["name", "class", "level", "experience", "gold", "completed_quests", "saved_at"]
+COMPACT_RATIO = 2
+COMPACT_MIN_ROWS = 100
+
+index_lock = threading.Lock()
+
+
+# summary of a save from the text written to its file, completed_quests
+# is only a count so the quest list is never built
+def summary_from_save_text(text, saved_at):
+    header_lines = []
+    completed = 0
+    for line in text.splitlines():
+        key, _, value = line.partition(":")
+        key = key.strip().lower()
+        if key == "completed_quests":
+            value = value.strip()
+            completed = value.count(",") + 1 if value else 0
+        elif key not in LIST_FIELDS:
+            header_lines.append(line)
+
+    header = parse_save_lines(header_lines)
+    for field in HEADER_FIELDS:
+        if field not in header:
+            raise MissingSaveFieldError(f"missing field: {field}")
+
+    return {
+        "name": header["name"],
+        "class": header["class"],
+        "level": header["level"],
+        "experience": header["experience"],
+        "gold": header["gold"],
+        "completed_quests": completed,
+        "saved_at": saved_at
+    }
+
+
+def index_path(save_directory):
+    return os.path.join(save_directory, INDEX_FILE)
+
+
+def summary_row(summary):
+    return (["save"] + [summary[field] for field in SUMMARY_FIELDS[:-1]]
+            + [repr(summary["saved_at"])])
+
+
+def record_summaries(save_directory, summaries):
+    rows = [summary_row(summary) for summary in summaries]
+
+    with index_lock:
+        # a new index starts from every save already in the folder
+        if not os.path.exists(index_path(save_directory)):
+            rebuild_summary_index(save_directory)
+        else:
+            append_index_rows(save_directory, rows)
+
+
+def record_deletion(save_directory, character_name):
+    with index_lock:
+        if not os.path.exists(index_path(save_directory)):
+            rebuild_summary_index(save_directory)
+        else:
+            append_index_rows(save_directory, [["delete", character_name]])
+
+    for listener in list(deletion_listeners):
+        listener(save_directory, character_name)
+
+
+# functions called as listener(save_directory, character_name) after a save
+# is deleted or quarantined, e.g. Leaderboard.character_deleted
+deletion_listeners = []
+
+
+def add_deletion_listener(listener):
+    deletion_listeners.append(listener)
+
+
+def remove_deletion_listener(listener):
+    if listener in deletion_listeners:
+        deletion_listeners.remove(listener)
+
+
+def append_index_rows(save_directory, rows):
+    # the index can always be rebuilt from the saves, so a failed append
+    # must not fail the save it describes
+    try:
+        with open(index_path(save_directory), "a", newline="") as f:
+            csv.writer(f, lineterminator="\n").writerows(rows)
+    except OSError:
+        pass
+
+
+# index path -> [file inode, bytes read, summaries by name, rows read], so
+# a repeated listing only reads the rows appended since the last one
+summary_cache = {}
+
+
+# read the index log, returns (summaries by name, rows read) or None if damaged
+def read_summary_index(save_directory):
+    path = index_path(save_directory)
+
+    try:
+        info = os.stat(path)
+        cached = summary_cache.get(path)
+        # a compacted index is a new file, so it is read from the start
+        if cached is None or cached[0] != info.st_ino or cached[1] > info.st_size:
+            cached = [info.st_ino, 0, {}, 0]
+
+        with open(path, "rb") as f:
+            f.seek(cached[1])
+            data = f.read()
+
+        # a row still being appended is left for the next read
+        end = data.rfind(b"\n") + 1
+        summaries = cached[2]
+
+        for row in csv.reader(data[:end].decode("utf-8").splitlines()):
+            cached[3] += 1
+            if len(row) == 2 and row[0] == "delete":
+                summaries.pop(row[1], None)
+            elif len(row) == 8 and row[0] == "save":
+                summaries[row[1]] = {
+                    "name": row[1],
+                    "class": row[2],
+                    "level": int(row[3]),
+                    "experience": int(row[4]),
+                    "gold": int(row[5]),
+                    "completed_quests": int(row[6]),
+                    "saved_at": float(row[7])
+                }
+            else:
+                raise ValueError("bad index row")
+
+        cached[1] += end
+    except (OSError, ValueError, UnicodeDecodeError, csv.Error):
+        summary_cache.pop(path, None)
+        return None
+
+    summary_cache[path] = cached
+    return cached[2], cached[3]
+
+
+# write the index again from the save files themselves
+def rebuild_summary_index(save_directory):
+    summaries = {}
+    for name in list_saved_characters(save_directory):
+        filename = os.path.join(save_directory, f"{name}_save.txt")
+        try:
+            with open(filename, "r") as f:
+                text = f.read()
+            summary = summary_from_save_text(text, os.path.getmtime(filename))
+        except (InvalidSaveDataError, OSError, UnicodeDecodeError):
+            continue
+
+        # saves are found by file name, so that is the name listed
+        summary["name"] = name
+        summaries[name] = summary
+
+    write_summary_index(save_directory, summaries)
+    return summaries
+
+
+def write_summary_index(save_directory, summaries):
+    text = io.StringIO()
+    csv.writer(text, lineterminator="\n").writerows(summary_row(summary) for summary in summaries.values())
+
+    if not os.path.exists(save_directory):
+        os.makedirs(save_directory)
+
+    path = index_path(save_directory)
+    data = text.getvalue().encode("utf-8")
+    try:
+        temp_name = write_temp_file(save_directory, data, path)
+        os.replace(temp_name, path)
+        summary_cache[path] = [os.stat(path).st_ino, len(data), dict(summaries), len(summaries)]
+    except OSError:
+        summary_cache.pop(path, None)
+
+
+def list_character_summaries(save_directory="data/save_games", sort_by="name", reverse=False):
+    """
+    Summaries of every saved character, read from the index file
+
+    Args:
+        save_directory: folder holding the saves and the index
+        sort_by: one of SUMMARY_FIELDS
+        reverse: sort largest first
+
+    Returns: list of dictionaries with the keys in SUMMARY_FIELDS
+    """
+    if sort_by not in SUMMARY_FIELDS:
+        raise ValueError(f"cannot sort by: {sort_by}")
+
+    if not os.path.exists(save_directory):
+        return []
+
+    with index_lock:
+        result = None
+        if os.path.exists(index_path(save_directory)):
+            result = read_summary_index(save_directory)
+
+        if result is None:
+            summaries = rebuild_summary_index(save_directory)
+        else:
+            summaries, row_count = result
+            if row_count > max(COMPACT_MIN_ROWS, COMPACT_RATIO * len(summaries)):
+                write_summary_index(save_directory, summaries)
+
+    return sorted(summaries.values(), key=lambda s: s[sort_by], reverse=reverse)
+
+
+# every SaveCache, so delete_character can drop their pending saves
+save_caches = weakref.WeakSet()
+
+
+# write-behind save cache
+class SaveCache:
+    """
+    Holds save requests and writes them to disk later, in one batch
+
+    save() records the character as it is at that moment and returns
+    straight away, so changes made after save() are not written until the
+    next save(). flush() writes each pending character once, however many
+    times it was saved, and skips characters whose saved fields have not
+    changed since the last write. delete_character drops anything pending
+    for the deleted character. start() flushes on a background thread every
+    interval seconds and stop() does a final flush.
+
+    on_flush, if given, is called after each write with the summaries
+    (see summary_from_save_text) of the characters written.
+    """
+
+    def __init__(self, save_directory="data/save_games", interval=5.0, on_flush=None):
+        self.save_directory = save_directory
+        self.interval = interval
+        self.on_flush = on_flush
+
+        self.pending = {}
+        self.snapshots = {}
+        self.last_error = None
+
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+        save_caches.add(self)
+
+    def save(self, character):
+        # the text is built now, the same way AsyncSaveManager does it
+        try:
+            snapshot = save_snapshot(character)
+            text = format_save_data(character)
+        except:
+            raise IOError("error saving character file")
+
+        with self.lock:
+            self.pending[character["name"]] = (snapshot, text)
+        return True
+
+    def dirty_fields(self, character):
+        """Saved fields that changed since this character was last written"""
+        old = self.snapshots.get(character["name"])
+        new = save_snapshot(character)
+        if old is None:
+            return SAVE_FIELDS + EQUIPMENT_FIELDS
+        return [field for field, a, b in zip(SAVE_FIELDS + EQUIPMENT_FIELDS, old, new) if a != b]
+
+    def flush(self):
+        """Write every pending character that changed, returns how many"""
+        with self.flush_lock:
+            with self.lock:
+                pending = self.pending
+                self.pending = {}
+
+            batch = []
+            snapshots = {}
+            for name, (snapshot, text) in pending.items():
+                if self.snapshots.get(name) != snapshot:
+                    batch.append((name, text))
+                    snapshots[name] = snapshot
+
+            if batch:
+                try:
+                    write_save_files(batch, self.save_directory)
+                except IOError:
+                    # put them back so the next flush tries again
+                    with self.lock:
+                        for name, entry in pending.items():
+                            self.pending.setdefault(name, entry)
+                    raise
+
+            self.snapshots.update(snapshots)
+
+            if batch and self.on_flush is not None:
+                saved_at = time.time()
+                self.on_flush([summary_from_save_text(text, saved_at) for name, text in batch])
+
+            return len(batch)
+
+    def has_unsaved_changes(self, character):
+        """True if the character changed since it was last passed to save()"""
+        name = character["name"]
+        with self.lock:
+            entry = self.pending.get(name)
+        last = entry[0] if entry is not None else self.snapshots.get(name)
+        return last != save_snapshot(character)
+
+    def forget(self, character_name):
+        """Drop a character that is being deleted"""
+        # waits for a flush in progress so it cannot write the save back
+        with self.flush_lock:
+            with self.lock:
+                self.pending.pop(character_name, None)
+            self.snapshots.pop(character_name, None)
+
+    def start(self):
+        if self.thread is not None:
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            try:
+                self.flush()
+                self.last_error = None
+            except IOError as e:
+                self.last_error = e
+
+    def stop(self):
+        if self.thread is not None:
+            self.stop_event.set()
+            self.thread.join()
+            self.thread = None
+        self.flush()
+
+
+# the saved fields of a character as a comparable tuple
+def save_snapshot(character):
+    values = []
+    for field in SAVE_FIELDS:
+        value = character[field]
+        if not isinstance(value, (str, int)):
+            value = tuple(value)
+        values.append(value)
+    for field in EQUIPMENT_FIELDS:
+        values.append(character.get(field))
+    return tuple(values)
+
+
+# functions called as listener(character) whenever gain_experience, add_gold
+# or complete_quest changes a character, e.g. Leaderboard.update
+character_listeners = []
+
+
+def add_character_listener(listener):
+    character_listeners.append(listener)
+
+
+def remove_character_listener(listener):
+    if listener in character_listeners:
+        character_listeners.remove(listener)
+
+
+def notify_character_changed(character):
+    for listener in list(character_listeners):
+        listener(character)
+
+
 # xp system and leveling
-def gain_experience(character, xp_amount):
+# (notify=False lets complete_quest tell the listeners once for a whole quest)
+def gain_experience(character, xp_amount, notify=True):
     if character["health"] == 0:
         raise CharacterDeadError("cannot gain xp while dead")
 
-    character["experience"] += xp_amount
+    levels, experience = resolve_level_ups(character["level"], character["experience"] + xp_amount)
+    character["experience"] = experience
 
-    while character["experience"] >= character["level"] * 100:
-        character["experience"] -= character["level"] * 100
-        character["level"] += 1
-        character["max_health"] += 10
-        character["strength"] += 2
-        character["magic"] += 2
+    if levels > 0:
+        character["level"] += levels
+        character["max_health"] += 10 * levels
+        character["strength"] += 2 * levels
+        character["magic"] += 2 * levels
         character["health"] = character["max_health"]
 
+    if notify:
+        notify_character_changed(character)
     return True
 
 
+# xp for many characters at once, dead characters are skipped
+def gain_experience_batch(characters, xp_amount):
+    granted = 0
+    for character in characters:
+        if character["health"] == 0:
+            continue
+        gain_experience(character, xp_amount)
+        granted += 1
+    return granted
+
+
+# going from level L to L + 1 costs L * 100 xp, so the cost of k levels
+# starting at L is 100 * (k*L + k*(k-1)/2). solving that quadratic for k
+# gives the number of level ups straight away instead of one at a time.
+# returns (levels gained, xp left over)
+def resolve_level_ups(level, experience):
+    if experience < level * 100:
+        return 0, experience
+
+    hundreds = experience // 100
+    b = 2 * level - 1
+    levels = (math.isqrt(b * b + 8 * hundreds) - b) // 2
+
+    # integer square root can land one off, nudge it to the exact answer
+    while (levels + 1) * (levels + 1 + b) <= 2 * hundreds:
+        levels += 1
+    while levels * (levels + b) > 2 * hundreds:
+        levels -= 1
+
+    cost = 100 * (levels * level + levels * (levels - 1) // 2)
+    return levels, experience - cost
+
+
 # gold updates
-def add_gold(character, amount):
+def add_gold(character, amount, notify=True):
     new_total = character["gold"] + amount
     if new_total < 0:
         raise ValueError("not enough gold")
     character["gold"] = new_total
+    if notify:
+        notify_character_changed(character)
     return character["gold"]
 
 
@@ -205,24 +909,21 @@ def revive_character(character):
 
 # validation
 def validate_character_data(character):
-    required = [
-        "name", "class", "level", "health", "max_health",
-        "strength", "magic", "experience", "gold",
-        "inventory", "active_quests", "completed_quests"
-    ]
-
-    for field in required:
+    for field in SAVE_FIELDS:
         if field not in character:
-            raise InvalidSaveDataError(f"missing field: {field}")
+            raise MissingSaveFieldError(f"missing field: {field}")
 
     num_fields = ["level", "health", "max_health", "strength", "magic", "experience", "gold"]
     for n in num_fields:
         if not isinstance(character[n], int):
-            raise InvalidSaveDataError(f"{n} must be an int")
+            raise InvalidSaveFieldTypeError(f"{n} must be an int")
+
+    if not isinstance(character["inventory"], (list, Inventory)):
+        raise InvalidSaveFieldTypeError("inventory must be a list")
 
-    list_fields = ["inventory", "active_quests", "completed_quests"]
+    list_fields = ["active_quests", "completed_quests"]
     for lst in list_fields:
-        if not isinstance(character[lst], list):
-            raise InvalidSaveDataError(f"{lst} must be a list")
+        if not isinstance(character[lst], (list, QuestLog)):
+            raise InvalidSaveFieldTypeError(f"{lst} must be a list")
 
     return True
@@ -0,0 +1,154 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Character Roster Module
+
+Name: Ajani Davis
+
+Holds the numeric stats of many characters in one column per stat so
+server-wide events (heal everyone, give a group XP, pay out gold, revive
+the dead) run as one pass over a column instead of one function call per
+character dictionary.
+"""
+
+from array import array
+
+from character_manager import resolve_level_ups
+
+STAT_COLUMNS = ["level", "health", "max_health", "strength", "magic", "experience", "gold"]
+
+
+class CharacterRoster:
+    """
+    Column store of character stats
+
+    Row i of every column belongs to the i-th character added. The bulk
+    methods only change the columns; write_back copies them into the
+    character records and sync copies the records back into the columns.
+    """
+
+    def __init__(self, characters=()):
+        self.characters = []
+        self.rows = {}
+        self.columns = {stat: array("q") for stat in STAT_COLUMNS}
+
+        for character in characters:
+            self.add(character)
+
+    def add(self, character):
+        """Add a character and return its row number"""
+        row = len(self.characters)
+        self.characters.append(character)
+        self.rows[character["name"]] = row
+
+        for stat in STAT_COLUMNS:
+            self.columns[stat].append(character[stat])
+
+        return row
+
+    def __len__(self):
+        return len(self.characters)
+
+    def row_of(self, name):
+        return self.rows[name]
+
+    def get_stat(self, name, stat):
+        return self.columns[stat][self.rows[name]]
+
+    # ------------------------------------------------------------------
+    # bulk events
+    # ------------------------------------------------------------------
+
+    def heal_all(self, amount):
+        """Heal every character like heal_character, returns total healed"""
+        health = self.columns["health"]
+        max_health = self.columns["max_health"]
+
+        total = 0
+        for i in range(len(health)):
+            new_hp = min(health[i] + amount, max_health[i])
+            total += new_hp - health[i]
+            health[i] = new_hp
+
+        return total
+
+    def add_gold_all(self, amount):
+        """
+        Give (or take) gold from every character like add_gold
+
+        Returns: number of characters changed
+        Raises: ValueError if anyone would go below zero (nobody is changed)
+        """
+        gold = self.columns["gold"]
+
+        if amount < 0 and len(gold) > 0 and min(gold) + amount < 0:
+            raise ValueError("not enough gold")
+
+        for i in range(len(gold)):
+            gold[i] += amount
+
+        return len(gold)
+
+    def grant_experience(self, xp_amount, rows=None):
+        """
+        Give XP to a group of rows (every row if rows is None) and level up
+
+        Dead characters cannot gain XP and are skipped, the same rule
+        gain_experience enforces by raising.
+
+        Returns: number of characters that gained XP
+        """
+        if rows is None:
+            rows = range(len(self.characters))
+
+        level = self.columns["level"]
+        health = self.columns["health"]
+        max_health = self.columns["max_health"]
+        strength = self.columns["strength"]
+        magic = self.columns["magic"]
+        experience = self.columns["experience"]
+
+        granted = 0
+        for i in rows:
+            if health[i] == 0:
+                continue
+
+            gained, experience[i] = resolve_level_ups(level[i], experience[i] + xp_amount)
+            if gained > 0:
+                level[i] += gained
+                max_health[i] += 10 * gained
+                strength[i] += 2 * gained
+                magic[i] += 2 * gained
+                health[i] = max_health[i]
+
+            granted += 1
+
+        return granted
+
+    def revive_all_dead(self):
+        """Revive every dead character at half health, returns how many"""
+        health = self.columns["health"]
+        max_health = self.columns["max_health"]
+
+        revived = 0
+        for i in range(len(health)):
+            if health[i] <= 0:
+                health[i] = max_health[i] // 2
+                revived += 1
+
+        return revived
+
+    # ------------------------------------------------------------------
+    # syncing with character records
+    # ------------------------------------------------------------------
+
+    def write_back(self):
+        """Copy the column values into every character record"""
+        for stat in STAT_COLUMNS:
+            column = self.columns[stat]
+            for i, character in enumerate(self.characters):
+                character[stat] = column[i]
+
+    def sync(self):
+        """Reload the columns from the character records"""
+        for stat in STAT_COLUMNS:
+            self.columns[stat] = array("q", [character[stat] for character in self.characters])
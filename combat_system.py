@@ -129,7 +129,7 @@ class SimpleBattle:
 
         damage = self.calculate_damage(self.character, self.enemy)
         self.apply_damage(self.enemy, damage)
-        display_battle_log(f"you hit the {self.enemy['name']} for {damage}")
+        self.log(f"you hit the {self.enemy['name']} for {damage}")
 
     def enemy_turn(self):
         if not self.combat_active:
@@ -137,7 +137,11 @@ class SimpleBattle:
 
         damage = self.calculate_damage(self.enemy, self.character)
         self.apply_damage(self.character, damage)
-        display_battle_log(f"the {self.enemy['name']} hits you for {damage}")
+        self.log(f"the {self.enemy['name']} hits you for {damage}")
+
+    def log(self, message):
+        # every battle message goes through here so a battle can be run quietly
+        display_battle_log(message)
 
     def calculate_damage(self, attacker, defender):
         dmg = attacker["strength"] - (defender["strength"] // 4)
@@ -159,14 +163,17 @@ class SimpleBattle:
             return "enemy"
         return None
 
-    def attempt_escape(self):
-        roll = random.random()
+    def attempt_escape(self, rng=None):
+        # rng lets simulations pass their own random.Random
+        if rng is None:
+            rng = random
+        roll = rng.random()
         if roll < 0.5:
             self.combat_active = False
-            display_battle_log("you escaped successfully")
+            self.log("you escaped successfully")
             return True
         else:
-            display_battle_log("escape failed")
+            self.log("escape failed")
             return False
 
 
@@ -174,7 +181,7 @@ class SimpleBattle:
 # SPECIAL ABILITIES    
 # ---------------------------------------------------------
 
-def use_special_ability(character, enemy):
+def use_special_ability(character, enemy, rng=None):
     c = character["class"]
 
     if c == "Warrior":
@@ -182,7 +189,7 @@ def use_special_ability(character, enemy):
     elif c == "Mage":
         return mage_fireball(character, enemy)
     elif c == "Rogue":
-        return rogue_critical_strike(character, enemy)
+        return rogue_critical_strike(character, enemy, rng)
     elif c == "Cleric":
         return cleric_heal(character)
     else:
@@ -202,8 +209,10 @@ def mage_fireball(character, enemy):
         enemy["health"] = 0
     return f"mage casts fireball for {dmg}"
 
-def rogue_critical_strike(character, enemy):
-    crit = random.random() < 0.5
+def rogue_critical_strike(character, enemy, rng=None):
+    if rng is None:
+        rng = random
+    crit = rng.random() < 0.5
     if crit:
         dmg = max(1, character["strength"] * 3)
         note = "critical hit"
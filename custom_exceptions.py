@@ -123,3 +123,11 @@ class InvalidSaveDataError(GameError):
     """Raised when save file contains invalid data"""
     pass
 
+class MissingSaveFieldError(InvalidSaveDataError):
+    """Raised when save data is missing a required field"""
+    pass
+
+class InvalidSaveFieldTypeError(InvalidSaveDataError):
+    """Raised when a save data field has the wrong type"""
+    pass
+
@@ -10,11 +10,18 @@ This module handles loading and validating game data from text files.
 """
 
 import os
+import pickle
+import hashlib
+import tempfile
+import threading
 from custom_exceptions import (
+    DataError,
     InvalidDataFormatError,
     MissingDataFileError,
-    CorruptedDataError
+    CorruptedDataError,
+    InvalidItemTypeError
 )
+from inventory_system import compile_item_effect
 
 # ============================================================================
 # DATA LOADING FUNCTIONS
@@ -26,30 +33,22 @@ def load_quests(filename="data/quests.txt"):
         raise MissingDataFileError(f"Quest file not found: {filename}")
 
     try:
-        with open(filename, "r") as f:
-            content = f.read().strip()
+        f = open(filename, "r")
     except:
         raise CorruptedDataError("Could not read quest file.")
 
-    if content == "":
-        raise InvalidDataFormatError("Quest file is empty.")
-
-    # split into blocks safely (ignore accidental extra blank lines)
-    blocks = [b.strip() for b in content.split("\n\n") if b.strip() != ""]
-
     quests = {}
 
-    for block in blocks:
-        lines = [line.strip() for line in block.split("\n") if line.strip() != ""]
-        quest_dict = parse_quest_block(lines)
-        validate_quest_data(quest_dict)
+    # records are parsed one block at a time as the file is read
+    with f:
+        try:
+            for quest_dict in iter_quests(f):
+                quests[quest_dict["quest_id"]] = quest_dict
+        except (OSError, UnicodeDecodeError):
+            raise CorruptedDataError("Could not read quest file.")
 
-        # must contain quest_id or test fails
-        qid = quest_dict.get("quest_id")
-        if not qid:
-            raise InvalidDataFormatError("Missing quest_id field.")
-
-        quests[qid] = quest_dict
+    if len(quests) == 0:
+        raise InvalidDataFormatError("Quest file is empty.")
 
     return quests
 
@@ -60,30 +59,347 @@ def load_items(filename="data/items.txt"):
         raise MissingDataFileError(f"Item file not found: {filename}")
 
     try:
-        with open(filename, "r") as f:
-            content = f.read().strip()
+        f = open(filename, "r")
     except:
         raise CorruptedDataError("Could not read item file.")
 
-    if content == "":
+    items = {}
+
+    with f:
+        try:
+            for item_dict in iter_items(f):
+                items[item_dict["item_id"]] = item_dict
+        except (OSError, UnicodeDecodeError):
+            raise CorruptedDataError("Could not read item file.")
+
+    if len(items) == 0:
         raise InvalidDataFormatError("Item file is empty.")
 
-    blocks = [b.strip() for b in content.split("\n\n") if b.strip() != ""]
+    return items
 
-    items = {}
 
-    for block in blocks:
-        lines = [line.strip() for line in block.split("\n") if line.strip() != ""]
-        item_dict = parse_item_block(lines)
-        validate_item_data(item_dict)
+# ============================================================================
+# STREAMING PARSERS
+# ============================================================================
 
-        item_id = item_dict.get("item_id")
-        if not item_id:
-            raise InvalidDataFormatError("Missing item_id field.")
+def iter_data_blocks(f):
+    """
+    Yield each blank-line separated block of an open data file as a list
+    of its stripped lines, reading only one block into memory at a time
+    """
+    block = []
 
-        items[item_id] = item_dict
+    for line in f:
+        line = line.strip()
+        if line == "":
+            if block:
+                yield block
+                block = []
+        else:
+            block.append(line)
 
-    return items
+    if block:
+        yield block
+
+
+def iter_quests(f):
+    """Yield validated quest dictionaries one at a time from an open file"""
+    for lines in iter_data_blocks(f):
+        yield parse_quest_record(lines)
+
+
+def iter_items(f):
+    """Yield validated item dictionaries one at a time from an open file"""
+    for lines in iter_data_blocks(f):
+        yield parse_item_record(lines)
+
+
+def parse_quest_record(lines):
+    quest_dict = parse_quest_block(lines)
+    validate_quest_data(quest_dict)
+
+    # must contain quest_id or test fails
+    if not quest_dict.get("quest_id"):
+        raise InvalidDataFormatError("Missing quest_id field.")
+
+    return quest_dict
+
+
+def parse_item_record(lines):
+    item_dict = parse_item_block(lines)
+    validate_item_data(item_dict)
+
+    if not item_dict.get("item_id"):
+        raise InvalidDataFormatError("Missing item_id field.")
+
+    # effects are compiled once here so using or equipping never parses them
+    try:
+        item_dict["modifiers"] = compile_item_effect(item_dict["effect"])
+    except InvalidItemTypeError:
+        raise InvalidDataFormatError(f"Invalid effect for item: {item_dict['item_id']}")
+
+    return item_dict
+
+
+# ============================================================================
+# HOT RELOAD
+# ============================================================================
+
+class DataFileWatcher:
+    """
+    Watches the quest and item files and reloads them when they change
+
+    Only blocks whose text changed since the last load are parsed and
+    validated again. A new catalog is built completely before it replaces
+    the old one, and a file with errors leaves the old catalog in place.
+    """
+
+    def __init__(self, quest_file="data/quests.txt", item_file="data/items.txt", on_reload=None):
+        self.quest_file = quest_file
+        self.item_file = item_file
+        self.on_reload = on_reload
+
+        self.quests = {}
+        self.items = {}
+        # error of each data file whose last reload failed, and one of them
+        self.file_errors = {}
+        self.last_error = None
+
+        # per file: last seen (mtime, size) and block text -> parsed record
+        self.file_stamps = {}
+        self.block_records = {quest_file: {}, item_file: {}}
+
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def current_stamps(self):
+        """(mtime, size) of each data file that exists, as check_for_updates sees them"""
+        stamps = {}
+        for filename in [self.quest_file, self.item_file]:
+            try:
+                info = os.stat(filename)
+            except OSError:
+                continue
+            stamps[filename] = (info.st_mtime_ns, info.st_size)
+        return stamps
+
+    def seed(self, quests, items, stamps):
+        """
+        Start from a catalog that was already loaded instead of parsing the
+        files again
+
+        stamps should come from current_stamps() taken before that catalog
+        was loaded, so an edit made during the load is still picked up.
+        Block records are not known yet, so the first reload of a file
+        parses all of its blocks.
+        """
+        with self.lock:
+            self.quests = quests
+            self.items = items
+            self.file_stamps = dict(stamps)
+
+    def check_for_updates(self):
+        """
+        Reload any data file that changed since the last check
+
+        Returns: True if a new catalog was swapped in
+        """
+        with self.lock:
+            changed = False
+
+            for filename, id_key, parse_record in [
+                (self.quest_file, "quest_id", parse_quest_record),
+                (self.item_file, "item_id", parse_item_record)
+            ]:
+                try:
+                    info = os.stat(filename)
+                except OSError:
+                    continue
+
+                stamp = (info.st_mtime_ns, info.st_size)
+                if self.file_stamps.get(filename) == stamp:
+                    continue
+
+                try:
+                    catalog = self.reload_file(filename, id_key, parse_record)
+                except (DataError, OSError, UnicodeDecodeError) as e:
+                    # keep serving the old catalog until the file is fixed
+                    self.file_errors[filename] = e
+                    self.file_stamps[filename] = stamp
+                    continue
+
+                self.file_stamps[filename] = stamp
+                self.file_errors.pop(filename, None)
+                if filename == self.quest_file:
+                    self.quests = catalog
+                else:
+                    self.items = catalog
+                changed = True
+
+            # cleared only once every file has reloaded cleanly
+            self.last_error = next(iter(self.file_errors.values()), None)
+
+            if changed and self.on_reload is not None:
+                self.on_reload(self.quests, self.items)
+
+            return changed
+
+    def reload_file(self, filename, id_key, parse_record):
+        old_records = self.block_records[filename]
+        new_records = {}
+        catalog = {}
+
+        with open(filename, "r") as f:
+            for lines in iter_data_blocks(f):
+                text = "\n".join(lines)
+
+                record = old_records.get(text)
+                if record is None:
+                    record = parse_record(lines)
+
+                new_records[text] = record
+                catalog[record[id_key]] = record
+
+        if len(catalog) == 0:
+            raise InvalidDataFormatError(f"Data file is empty: {filename}")
+
+        self.block_records[filename] = new_records
+        return catalog
+
+    def start(self, interval=1.0):
+        """Check for updates every interval seconds on a background thread"""
+        if self.thread is not None:
+            return
+
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.watch, args=(interval,), daemon=True)
+        self.thread.start()
+
+    def watch(self, interval):
+        while not self.stop_event.wait(interval):
+            self.check_for_updates()
+
+    def stop(self):
+        if self.thread is None:
+            return
+
+        self.stop_event.set()
+        self.thread.join()
+        self.thread = None
+
+
+# ============================================================================
+# COMPILED DATA CACHE
+# ============================================================================
+
+# bump this whenever the parsed quest or item dictionaries change shape
+DATA_CACHE_VERSION = 2
+
+
+def load_game_data_cached(quest_file="data/quests.txt", item_file="data/items.txt",
+                          cache_file="data/game_data.cache"):
+    """
+    Load quests and items, reusing a pickled snapshot when the text files
+    have not changed since it was written
+
+    A snapshot is reused when every source file has the same modification
+    time and size, or the same content hash if only the time changed.
+
+    Returns: (quests, items) tuple of dictionaries
+    Raises: same errors as load_quests and load_items
+    """
+    sources = [quest_file, item_file]
+
+    for filename in sources:
+        if not os.path.exists(filename):
+            raise MissingDataFileError(f"Data file not found: {filename}")
+
+    stats = {filename: os.stat(filename) for filename in sources}
+    snapshot = read_data_cache(cache_file)
+
+    if snapshot is not None and snapshot["sources"] == sources:
+        unchanged = True
+        touched = False
+
+        for filename in sources:
+            info = snapshot["files"][filename]
+            if info["mtime_ns"] == stats[filename].st_mtime_ns and info["size"] == stats[filename].st_size:
+                continue
+            if info["size"] == stats[filename].st_size and info["sha256"] == hash_data_file(filename):
+                # file was only touched, the contents are the same
+                info["mtime_ns"] = stats[filename].st_mtime_ns
+                touched = True
+                continue
+            unchanged = False
+            break
+
+        if unchanged:
+            if touched:
+                write_data_cache(cache_file, snapshot)
+            return snapshot["quests"], snapshot["items"]
+
+    quests = load_quests(quest_file)
+    items = load_items(item_file)
+
+    snapshot = {
+        "version": DATA_CACHE_VERSION,
+        "sources": sources,
+        "files": {},
+        "quests": quests,
+        "items": items
+    }
+    for filename in sources:
+        snapshot["files"][filename] = {
+            "mtime_ns": stats[filename].st_mtime_ns,
+            "size": stats[filename].st_size,
+            "sha256": hash_data_file(filename)
+        }
+
+    write_data_cache(cache_file, snapshot)
+    return quests, items
+
+
+def hash_data_file(filename):
+    with open(filename, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def read_data_cache(cache_file):
+    # a missing, old or damaged snapshot just means parsing the text again
+    try:
+        with open(cache_file, "rb") as f:
+            snapshot = pickle.load(f)
+    except Exception:
+        return None
+
+    if not isinstance(snapshot, dict) or snapshot.get("version") != DATA_CACHE_VERSION:
+        return None
+
+    return snapshot
+
+
+def write_data_cache(cache_file, snapshot):
+    # the cache is only a speedup, so failing to write it is not an error
+    folder = os.path.dirname(cache_file) or "."
+    try:
+        fd, temp_name = tempfile.mkstemp(dir=folder, prefix=".", suffix=".tmp")
+    except OSError:
+        return
+
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_name, cache_file)
+    except (OSError, pickle.PicklingError, TypeError, AttributeError):
+        # a disk error or a record pickle cannot write
+        pass
+    finally:
+        # after a successful replace the temp file is already gone
+        try:
+            os.remove(temp_name)
+        except OSError:
+            pass
 
 
 # ============================================================================
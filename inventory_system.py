@@ -9,6 +9,7 @@ AI Usage: AI only used for help in debugging and making the README.md
 This module handles inventory management, item usage, and equipment.
 """
 
+from functools import lru_cache
 from custom_exceptions import (
     InventoryFullError,
     ItemNotFoundError,
@@ -19,6 +20,82 @@ from custom_exceptions import (
 # Maximum inventory size
 MAX_INVENTORY_SIZE = 20
 
+# stats an item effect can change
+VALID_STATS = ["health", "max_health", "strength", "magic"]
+
+# ============================================================================
+# INVENTORY CONTAINER
+# ============================================================================
+
+class Inventory:
+    """
+    Character inventory stored as item_id -> count
+
+    Works like the plain list of item IDs it replaces (append, remove,
+    count, in, len, iteration), but every one of those is a single dict
+    lookup instead of a scan. Each item still takes one slot, so len()
+    is the number of slots used.
+    """
+
+    __slots__ = ("counts", "size")
+
+    def __init__(self, items=()):
+        self.counts = {}
+        self.size = 0
+        for item_id in items:
+            self.append(item_id)
+
+    def append(self, item_id):
+        self.counts[item_id] = self.counts.get(item_id, 0) + 1
+        self.size += 1
+
+    def extend(self, items):
+        for item_id in items:
+            self.append(item_id)
+
+    def remove(self, item_id):
+        count = self.counts.get(item_id, 0)
+        if count == 0:
+            raise ValueError(f"{item_id} not in inventory")
+
+        if count == 1:
+            del self.counts[item_id]
+        else:
+            self.counts[item_id] = count - 1
+        self.size -= 1
+
+    def count(self, item_id):
+        return self.counts.get(item_id, 0)
+
+    def clear(self):
+        self.counts.clear()
+        self.size = 0
+
+    def copy(self):
+        return list(self)
+
+    def __contains__(self, item_id):
+        return item_id in self.counts
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        # stacks come out together, in the order each item was first added
+        for item_id, count in self.counts.items():
+            for _ in range(count):
+                yield item_id
+
+    def __eq__(self, other):
+        if isinstance(other, Inventory):
+            return self.counts == other.counts
+        if isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+
+    def __repr__(self):
+        return f"Inventory({list(self)!r})"
+
 # ============================================================================
 # INVENTORY MANAGEMENT
 # ============================================================================
@@ -145,15 +222,14 @@ def use_item(character, item_id, item_data):
     if item_data["type"] != "consumable":
         raise InvalidItemTypeError("Item is not a consumable.") # only consumables can be "used"
 
-    effect_tuple = item_data["effect"] # effect looks like: "health:20"
+    modifiers = get_item_modifiers(item_data) # effect looks like: (("health", 20),)
 
-    stat_name, value = parse_item_effect(effect_tuple)
-
-    apply_stat_effect(character, stat_name, value) # apply the effect to the character
+    apply_modifiers(character, modifiers) # apply the effect to the character
 
     inventory.remove(item_id) # remove the item after using it
 
-    return f"You used {item_id} and gained {stat_name} +{value}."
+    gains = ", ".join(f"{stat_name} +{value}" for stat_name, value in modifiers)
+    return f"You used {item_id} and gained {gains}."
 
 def equip_weapon(character, item_id, item_data):
     """
@@ -192,18 +268,17 @@ def equip_weapon(character, item_id, item_data):
         old_effect = character["equipped_weapon_effect"]    
 
         # reverse the old weapon's stat effect
-        stat_name, value = parse_item_effect(old_effect)
-        apply_stat_effect(character, stat_name, -value)      # subtract bonus
+        apply_modifiers(character, compile_item_effect(old_effect), -1)      # subtract bonus
 
         # add old weapon back to inventory
         inventory.append(old_weapon)
 
-    # parse the new weapon's effect
+    # the new weapon's effect
     effect_string = item_data["effect"]   # example: "strength:5"
-    stat_name, value = parse_item_effect(effect_string)
+    modifiers = get_item_modifiers(item_data)
 
     # apply stat bonus
-    apply_stat_effect(character, stat_name, value)
+    apply_modifiers(character, modifiers)
 
     # store equipped data on character
     character["equipped_weapon"] = item_id
@@ -212,7 +287,7 @@ def equip_weapon(character, item_id, item_data):
     # remove new weapon from inventory
     inventory.remove(item_id)
 
-    return f"You equipped {item_id} (+{stat_name} {value})."
+    return f"You equipped {item_id} ({describe_modifiers(modifiers)})."
 
 
 def equip_armor(character, item_id, item_data):
@@ -252,18 +327,17 @@ def equip_armor(character, item_id, item_data):
         old_effect = character["equipped_armor_effect"]
 
         # reverse old armor bonus
-        stat_name, value = parse_item_effect(old_effect)
-        apply_stat_effect(character, stat_name, -value)   # subtract the old bonus
+        apply_modifiers(character, compile_item_effect(old_effect), -1)   # subtract the old bonus
 
         # return old armor to inventory
         inventory.append(old_armor)
 
-    # parse new armor effect (example: "max_health:10")
+    # new armor effect (example: "max_health:10")
     effect_string = item_data["effect"]
-    stat_name, value = parse_item_effect(effect_string)
+    modifiers = get_item_modifiers(item_data)
 
     # apply bonus
-    apply_stat_effect(character, stat_name, value)
+    apply_modifiers(character, modifiers)
 
     # save equipped armor info on character
     character["equipped_armor"] = item_id
@@ -272,7 +346,7 @@ def equip_armor(character, item_id, item_data):
     # remove armor from inventory
     inventory.remove(item_id)
 
-    return f"You equipped {item_id} (+{stat_name} {value})."
+    return f"You equipped {item_id} ({describe_modifiers(modifiers)})."
 
 def unequip_weapon(character):
     """
@@ -295,8 +369,7 @@ def unequip_weapon(character):
         raise InventoryFullError("Inventory is full.")
 
     # reverse the weapon's stat bonus
-    stat_name, value = parse_item_effect(effect)
-    apply_stat_effect(character, stat_name, -value)   # subtract bonus
+    apply_modifiers(character, compile_item_effect(effect), -1)   # subtract bonus
 
     # add weapon back to inventory
     inventory.append(weapon_id)
@@ -329,8 +402,7 @@ def unequip_armor(character):
         raise InventoryFullError("Inventory is full.")
 
     # reverse the armor's stat bonus
-    stat_name, value = parse_item_effect(effect)
-    apply_stat_effect(character, stat_name, -value)   # subtract bonus
+    apply_modifiers(character, compile_item_effect(effect), -1)   # subtract bonus
 
     # add old armor back to inventory
     inventory.append(armor_id)
@@ -421,12 +493,20 @@ def parse_item_effect(effect_string):
     
     Returns: Tuple of (stat_name, value)
     Example: "health:20" → ("health", 20)
+
+    Raises: InvalidItemTypeError if the format is wrong or the stat is not
+            in VALID_STATS
     """
     # effect must contain a colon
     if ":" not in effect_string:
         raise InvalidItemTypeError("Invalid effect format.")
 
     stat_name, value_str = effect_string.split(":", 1) #make sure it only does it one time
+    stat_name = stat_name.strip()
+
+    # checked here so a typo fails when the item file is loaded, not on use
+    if stat_name not in VALID_STATS:
+        raise InvalidItemTypeError(f"Unknown stat in effect: {stat_name}")
 
     try:
         value = int(value_str)
@@ -436,6 +516,47 @@ def parse_item_effect(effect_string):
     return stat_name, value
 
 
+@lru_cache(maxsize=None)
+def compile_item_effect(effect_string):
+    """
+    Turn an effect string into a tuple of (stat_name, value) modifiers
+
+    Several modifiers can be given separated by commas, for example
+    "strength:5,magic:3". Results are cached, so each distinct effect
+    string is only ever parsed once.
+
+    Returns: Tuple of (stat_name, value) tuples
+    Example: "strength:5,magic:3" → (("strength", 5), ("magic", 3))
+    """
+    if not isinstance(effect_string, str):
+        raise InvalidItemTypeError("Invalid effect format.")
+
+    return tuple(parse_item_effect(part.strip()) for part in effect_string.split(","))
+
+
+def get_item_modifiers(item_data):
+    """
+    Get the compiled modifiers for an item
+
+    Items loaded by game_data already carry them under "modifiers";
+    anything else has its effect string compiled (and cached) here.
+    """
+    modifiers = item_data.get("modifiers")
+    if modifiers is None:
+        modifiers = compile_item_effect(item_data["effect"])
+    return modifiers
+
+
+def apply_modifiers(character, modifiers, sign=1):
+    """Apply every (stat_name, value) modifier, sign=-1 removes them"""
+    for stat_name, value in modifiers:
+        apply_stat_effect(character, stat_name, sign * value)
+
+
+def describe_modifiers(modifiers):
+    return ", ".join(f"+{stat_name} {value}" for stat_name, value in modifiers)
+
+
 def apply_stat_effect(character, stat_name, value):
     """
     Apply a stat modification to character
@@ -452,6 +573,24 @@ def apply_stat_effect(character, stat_name, value):
         if character["health"] > character["max_health"]:
             character["health"] = character["max_health"]
 
+def get_item_counts(inventory):
+    """
+    Get item_id -> quantity for an inventory
+
+    Returns: Dictionary of counts (the live counts for an Inventory)
+    """
+    if isinstance(inventory, Inventory):
+        return inventory.counts
+
+    # plain list inventories have to be counted (duplicates may exist)
+    item_counts = {}
+    for item_id in inventory:
+        if item_id not in item_counts:
+            item_counts[item_id] = 0
+        item_counts[item_id] += 1
+
+    return item_counts
+
 def display_inventory(character, item_data_dict):
     """
     Display character's inventory in formatted way
@@ -468,12 +607,7 @@ def display_inventory(character, item_data_dict):
         print("Inventory is empty.")
         return
 
-    # Count items (because duplicates may exist)
-    item_counts = {}
-    for item_id in inventory:
-        if item_id not in item_counts:
-            item_counts[item_id] = 0
-        item_counts[item_id] += 1
+    item_counts = get_item_counts(inventory)
 
     print("=== INVENTORY ===")
 
@@ -0,0 +1,271 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Leaderboard Module
+
+Name: Ajani Davis
+
+Ranks characters by level, lifetime experience, gold and completed quests.
+Each category keeps its players in a sorted list, so a change to one
+character moves only that character's entry, and the rank of a player is
+found with a binary search. Updates come from the character_manager
+listener hook, which gain_experience, add_gold and complete_quest call.
+
+Two sets of scores are kept: the live ones that the rankings use, and
+the saved ones taken from the character saves as they are written. Only
+the saved scores go into the CSV file next to the saves, so the file never
+holds progress the saves do not have. The file is read back when the
+leaderboard is created and checked against the character summary index,
+and without a file the leaderboard is built from that index, so it never
+needs every save loaded to start.
+"""
+
+import csv
+import io
+import os
+import threading
+from bisect import bisect_left, insort
+
+from character_manager import (
+    list_character_summaries,
+    write_temp_file,
+    sync_directory
+)
+
+CATEGORIES = ["level", "experience", "gold", "completed_quests"]
+LEADERBOARD_FILE = "leaderboard.csv"
+
+
+def lifetime_experience(level, experience):
+    # xp spent on levels is not kept on the character: reaching level L
+    # costs 100 + 200 + ... + 100 * (L - 1)
+    return 50 * level * (level - 1) + experience
+
+
+def character_scores(character):
+    """Scores of a character in CATEGORIES order"""
+    return (
+        character["level"],
+        lifetime_experience(character["level"], character["experience"]),
+        character["gold"],
+        len(character["completed_quests"])
+    )
+
+
+def summary_scores(summary):
+    """Scores from a list_character_summaries entry, in CATEGORIES order"""
+    return (
+        summary["level"],
+        lifetime_experience(summary["level"], summary["experience"]),
+        summary["gold"],
+        summary["completed_quests"]
+    )
+
+
+class Leaderboard:
+    """
+    Sorted rankings for every category in CATEGORIES
+
+    Each category list holds (-score, name) so the best score comes first
+    and ties are listed by name.
+    """
+
+    def __init__(self, save_directory="data/save_games", load_file=True):
+        self.save_directory = save_directory
+        self.filename = os.path.join(save_directory, LEADERBOARD_FILE)
+        self.scores = {}
+        self.saved_scores = {}
+        self.rankings = {category: [] for category in CATEGORIES}
+        self.lock = threading.Lock()
+
+        if not load_file:
+            return
+        if os.path.exists(self.filename):
+            self.load()
+        else:
+            self.rebuild()
+
+    def __len__(self):
+        return len(self.scores)
+
+    def __contains__(self, name):
+        return name in self.scores
+
+    # ------------------------------------------------------------------
+    # updates
+    # ------------------------------------------------------------------
+
+    def update(self, character):
+        """Add a character or move it to match its current stats"""
+        self.set_scores(character["name"], character_scores(character))
+
+    def set_scores(self, name, scores):
+        with self.lock:
+            old_scores = self.scores.get(name)
+            if old_scores == scores:
+                return
+
+            for i, category in enumerate(CATEGORIES):
+                ranking = self.rankings[category]
+                if old_scores is not None:
+                    if old_scores[i] == scores[i]:
+                        continue
+                    del ranking[bisect_left(ranking, (-old_scores[i], name))]
+                insort(ranking, (-scores[i], name))
+
+            self.scores[name] = scores
+
+    def remove(self, name):
+        """Take a character off every ranking, returns False if it was not on"""
+        with self.lock:
+            self.saved_scores.pop(name, None)
+            scores = self.scores.pop(name, None)
+            if scores is None:
+                return False
+
+            for i, category in enumerate(CATEGORIES):
+                ranking = self.rankings[category]
+                del ranking[bisect_left(ranking, (-scores[i], name))]
+
+        return True
+
+    def record_saved(self, summaries):
+        """
+        Take the scores of characters that were just written to disk (a
+        SaveCache on_flush callback) and save the leaderboard file
+        """
+        for summary in summaries:
+            name = summary["name"]
+            scores = summary_scores(summary)
+            with self.lock:
+                old_saved = self.saved_scores.get(name)
+                self.saved_scores[name] = scores
+                # live scores with no progress beyond the old save follow it
+                follow = self.scores.get(name) in (None, old_saved)
+            if follow:
+                self.set_scores(name, scores)
+
+        self.save()
+
+    def revert(self, name):
+        """Put a character back to its saved scores, dropping unsaved progress"""
+        with self.lock:
+            scores = self.saved_scores.get(name)
+        if scores is None:
+            self.remove(name)
+        else:
+            self.set_scores(name, scores)
+
+    def character_deleted(self, save_directory, name):
+        """Deletion listener for character_manager.add_deletion_listener"""
+        if os.path.abspath(save_directory) != os.path.abspath(self.save_directory):
+            return
+        if self.remove(name):
+            self.save()
+
+    # ------------------------------------------------------------------
+    # queries
+    # ------------------------------------------------------------------
+
+    def rank_of(self, name, category):
+        """
+        Rank of a character in a category, 1 is best
+
+        Characters with the same score share a rank.
+
+        Raises: KeyError if the character or category is unknown
+        """
+        if category not in CATEGORIES:
+            raise KeyError(f"unknown category: {category}")
+
+        with self.lock:
+            score = self.scores[name][CATEGORIES.index(category)]
+            # (-score,) sorts before every entry with that score
+            return bisect_left(self.rankings[category], (-score,)) + 1
+
+    def score_of(self, name, category):
+        if category not in CATEGORIES:
+            raise KeyError(f"unknown category: {category}")
+        return self.scores[name][CATEGORIES.index(category)]
+
+    def top(self, category, count=10):
+        """The best count characters in a category as (name, score) pairs"""
+        if category not in CATEGORIES:
+            raise KeyError(f"unknown category: {category}")
+
+        with self.lock:
+            return [(name, -score) for score, name in self.rankings[category][:count]]
+
+    # ------------------------------------------------------------------
+    # saving
+    # ------------------------------------------------------------------
+
+    def save(self):
+        """Write the saved scores to the leaderboard file in one rename"""
+        text = io.StringIO()
+        writer = csv.writer(text, lineterminator="\n")
+        writer.writerow(["name"] + CATEGORIES)
+
+        with self.lock:
+            for name, scores in self.saved_scores.items():
+                writer.writerow([name] + list(scores))
+
+        if not os.path.exists(self.save_directory):
+            os.makedirs(self.save_directory)
+
+        try:
+            temp_name = write_temp_file(self.save_directory, text.getvalue(), self.filename)
+            os.replace(temp_name, self.filename)
+            sync_directory(self.save_directory)
+        except OSError:
+            raise IOError("error saving leaderboard")
+
+        return True
+
+    def load(self):
+        """
+        Replace the rankings with the ones in the leaderboard file
+
+        Raises: IOError if the file cannot be read or is damaged
+        """
+        scores = {}
+        try:
+            with open(self.filename, "r", newline="") as f:
+                reader = csv.reader(f)
+                if next(reader, None) != ["name"] + CATEGORIES:
+                    raise ValueError("wrong columns")
+
+                for row in reader:
+                    if len(row) != len(CATEGORIES) + 1:
+                        raise ValueError("wrong number of columns")
+                    scores[row[0]] = tuple(int(value) for value in row[1:])
+        except (OSError, ValueError, csv.Error):
+            raise IOError("error loading leaderboard")
+
+        # saves deleted or written while no leaderboard was running are
+        # caught up from the summary index
+        summaries = {s["name"]: s for s in list_character_summaries(self.save_directory)}
+        for name in list(scores):
+            if name not in summaries:
+                del scores[name]
+        for name, summary in summaries.items():
+            if name not in scores:
+                scores[name] = summary_scores(summary)
+
+        # one sort per category is cheaper than inserting players one by one
+        rankings = {}
+        for i, category in enumerate(CATEGORIES):
+            rankings[category] = sorted((-s[i], name) for name, s in scores.items())
+
+        with self.lock:
+            self.scores = scores
+            self.saved_scores = dict(scores)
+            self.rankings = rankings
+
+    def rebuild(self):
+        """Rank every saved character from the summary index, returns how many"""
+        for summary in list_character_summaries(self.save_directory):
+            scores = summary_scores(summary)
+            with self.lock:
+                self.saved_scores[summary["name"]] = scores
+            self.set_scores(summary["name"], scores)
+        return len(self.scores)
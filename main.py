@@ -12,12 +12,18 @@ import inventory_system
 import quest_handler
 import combat_system
 import game_data
+import leaderboard
 from custom_exceptions import *
 
 current_character = None
 all_quests = {}
 all_items = {}
+quest_index = None
+quest_tracker = None
 game_running = False
+data_watcher = None
+save_cache = character_manager.SaveCache()
+rankings = None
 
 
 def main_menu():
@@ -64,11 +70,15 @@ def new_game():
 
     try:
         current_character = character_manager.create_character(name, char_class)
-        character_manager.save_character(current_character)
     except InvalidCharacterClassError:
         print("Invalid class.")
         return
 
+    try:
+        save_progress()
+    except IOError:
+        print("Error saving game.")
+
     game_loop()
 
 
@@ -78,21 +88,22 @@ def load_game():
     load_game_data()
 
     print("\n=== LOAD GAME ===")
-    saved_chars = character_manager.list_saved_characters()
+    # the menu comes from the summary index, no save file is opened
+    saved_chars = character_manager.list_character_summaries()
 
     if len(saved_chars) == 0:
         print("No saved characters found.")
         return
 
-    for i, name in enumerate(saved_chars, 1):
-        print(f"{i}. {name}")
+    for i, summary in enumerate(saved_chars, 1):
+        print(f"{i}. {summary['name']} - Level {summary['level']} {summary['class']}, {summary['gold']} gold")
 
     choice = input("Pick a character number: ").strip()
     while not choice.isdigit() or int(choice) < 1 or int(choice) > len(saved_chars):
         print("Invalid choice.")
         choice = input("Pick a character number: ").strip()
 
-    char_name = saved_chars[int(choice) - 1]
+    char_name = saved_chars[int(choice) - 1]['name']
 
     try:
         current_character = character_manager.load_character(char_name)
@@ -100,6 +111,8 @@ def load_game():
         print("Error loading save.")
         return
 
+    rankings.update(current_character)
+
     game_loop()
 
 
@@ -107,6 +120,7 @@ def game_loop():
     global game_running, current_character
 
     game_running = True
+    start_quest_tracker()
 
     while game_running:
         choice = game_menu()
@@ -126,6 +140,11 @@ def game_loop():
             print("Goodbye.")
             game_running = False
 
+    # progress that was never saved (quitting after death) comes back off
+    # the leaderboard
+    if save_cache.has_unsaved_changes(current_character):
+        rankings.revert(current_character['name'])
+
 
 def game_menu():
     print("\n=== GAME MENU ===")
@@ -159,6 +178,10 @@ def view_character_stats():
     print(f"Active Quests: {len(c['active_quests'])}")
     print(f"Completed Quests: {len(c['completed_quests'])}")
 
+    if c['name'] in rankings:
+        print(f"Rank: #{rankings.rank_of(c['name'], 'level')} by level, "
+              f"#{rankings.rank_of(c['name'], 'gold')} by gold")
+
 
 def view_inventory():
     global current_character, all_items
@@ -205,7 +228,7 @@ def view_inventory():
 
 
 def quest_menu():
-    global current_character, all_quests
+    global current_character, all_quests, quest_tracker
 
     print("\n=== QUEST MENU ===")
     print("1. View Active Quests")
@@ -224,7 +247,9 @@ def quest_menu():
             quest_handler.display_quest_info(q)
 
     elif choice == "2":
-        available = quest_handler.get_available_quests(current_character, all_quests)
+        # battles may have levelled the character up since the last look
+        quest_tracker.level_changed()
+        available = quest_tracker.available_quests()
         for q in available:
             quest_handler.display_quest_list([q])
 
@@ -236,7 +261,7 @@ def quest_menu():
     elif choice == "4":
         qid = input("Enter quest_id: ").strip()
         try:
-            quest_handler.accept_quest(current_character, qid, all_quests)
+            quest_tracker.accept(qid)
             print("Quest accepted.")
         except Exception as e:
             print(f"Error: {e}")
@@ -244,7 +269,7 @@ def quest_menu():
     elif choice == "5":
         qid = input("Enter quest_id: ").strip()
         try:
-            quest_handler.abandon_quest(current_character, qid)
+            quest_tracker.abandon(qid)
             print("Quest abandoned.")
         except Exception as e:
             print(f"Error: {e}")
@@ -252,7 +277,7 @@ def quest_menu():
     elif choice == "6":
         qid = input("Enter quest_id: ").strip()
         try:
-            rewards = quest_handler.complete_quest(current_character, qid, all_quests)
+            rewards = quest_tracker.complete(qid)
             print("Quest completed.")
             print(f"XP: {rewards['xp']}")
             print(f"Gold: {rewards['gold']}")
@@ -318,26 +343,80 @@ def save_game():
         return
 
     try:
-        character_manager.save_character(current_character)
+        save_progress()
         print("Game saved.")
     except Exception:
         print("Error saving game.")
 
 
+def save_progress():
+    # written later by the save cache, which also saves the leaderboard
+    save_cache.save(current_character)
+    rankings.update(current_character)
+
+
 def load_game_data():
-    global all_quests, all_items
+    global all_quests, all_items, quest_index
 
     try:
-        all_quests = game_data.load_quests("data/quests.txt")
-        all_items = game_data.load_items("data/items.txt")
+        all_quests, all_items = game_data.load_game_data_cached()
     except MissingDataFileError:
         game_data.create_default_data_files()
-        all_quests = game_data.load_quests("data/quests.txt")
-        all_items = game_data.load_items("data/items.txt")
+        all_quests, all_items = game_data.load_game_data_cached()
     except InvalidDataFormatError:
         all_quests = {}
         all_items = {}
 
+    # broken prerequisites (missing quests or cycles) are caught at load,
+    # building the index checks them
+    try:
+        quest_index = quest_handler.QuestIndex(all_quests)
+    except (QuestNotFoundError, InvalidDataFormatError):
+        all_quests = {}
+        quest_index = quest_handler.QuestIndex(all_quests)
+
+
+def start_quest_tracker():
+    global quest_tracker
+
+    # available quests are worked out once, then kept up to date as quests
+    # are accepted and completed instead of scanning every menu visit
+    quest_tracker = quest_handler.AvailableQuestTracker(current_character, all_quests, quest_index)
+
+
+def start_data_watcher():
+    global data_watcher
+
+    # picks up edits to the data files while the game is running
+    data_watcher = game_data.DataFileWatcher(on_reload=apply_reloaded_data)
+
+    # the watcher starts from the catalog load_game_data loads (usually the
+    # cached snapshot) instead of parsing both files a second time. stamps
+    # are read first so an edit made during the load is still seen
+    stamps = data_watcher.current_stamps()
+    load_game_data()
+    data_watcher.seed(all_quests, all_items, stamps)
+    data_watcher.start()
+
+
+def apply_reloaded_data(quests, items):
+    global all_quests, all_items, quest_index
+
+    quests_changed = quests is not all_quests
+    if quests_changed:
+        # keep the current quests if the new ones have broken prerequisites
+        try:
+            quest_index = quest_handler.QuestIndex(quests)
+        except (QuestNotFoundError, InvalidDataFormatError):
+            all_items = items
+            return
+    all_quests = quests
+    all_items = items
+
+    # a new catalog needs a new tracker for the character being played
+    if quests_changed and quest_tracker is not None:
+        start_quest_tracker()
+
 
 def handle_character_death():
     global current_character, game_running
@@ -371,9 +450,29 @@ def display_welcome():
     print("Welcome to Quest Chronicles.\n")
 
 
+def start_leaderboard():
+    global rankings
+
+    # with no leaderboard file yet it is built from the saved characters
+    try:
+        rankings = leaderboard.Leaderboard()
+    except IOError:
+        # a damaged leaderboard file is rebuilt from the saves
+        rankings = leaderboard.Leaderboard(load_file=False)
+        rankings.rebuild()
+
+    # xp, gold and quest changes move the player on the leaderboard
+    character_manager.add_character_listener(rankings.update)
+    character_manager.add_deletion_listener(rankings.character_deleted)
+
+
 def main():
     display_welcome()
-    load_game_data()
+    start_data_watcher()
+    start_leaderboard()
+    # the leaderboard file is only written when the saves are
+    save_cache.on_flush = rankings.record_saved
+    save_cache.start()
 
     while True:
         choice = main_menu()
@@ -384,6 +483,8 @@ def main():
             load_game()
         elif choice == 3:
             print("Thanks for playing.")
+            data_watcher.stop()
+            save_cache.stop()
             break
 
 
@@ -4,14 +4,18 @@ AI Usage: AI only used for help in debugging and making the README.md
 
 """
 
+import heapq
+from itertools import islice
+from bisect import bisect_left, bisect_right
 from custom_exceptions import (
     QuestNotFoundError,
     QuestRequirementsNotMetError,
     QuestAlreadyCompletedError,
     QuestNotActiveError,
-    InsufficientLevelError
+    InsufficientLevelError,
+    InvalidDataFormatError
 )
-from character_manager import gain_experience, add_gold
+from character_manager import gain_experience, add_gold, notify_character_changed, QuestLog
 
 # ============================================================================
 # QUEST MANAGEMENT
@@ -71,8 +75,10 @@ def complete_quest(character, quest_id, quests):
     xp = quest["reward_xp"]
     gold = quest["reward_gold"]
 
-    gain_experience(character, xp)
-    add_gold(character, gold)
+    # listeners hear about the whole quest once, not once per reward
+    gain_experience(character, xp, notify=False)
+    add_gold(character, gold, notify=False)
+    notify_character_changed(character)
 
     return {"xp": xp, "gold": gold}
 
@@ -101,8 +107,15 @@ def get_completed_quests(character, quests):
     return [quests[q] for q in character["completed_quests"] if q in quests]
 
 
-def get_available_quests(character, quests):
-    """Return quests the character is eligible to accept"""
+def get_available_quests(character, quests, index=None):
+    """
+    Return quests the character is eligible to accept
+
+    Passing a QuestIndex built for quests avoids walking the whole catalog.
+    """
+    if index is not None:
+        return [quests[qid] for qid in index.available_quest_ids(character)]
+
     available = []
 
     for qid, quest in quests.items():
@@ -153,18 +166,27 @@ def can_accept_quest(character, quest_id, quests):
 
     return True
 
-def get_quest_prerequisite_chain(quest_id, quests):
+def get_quest_prerequisite_chain(quest_id, quests, index=None):
+    if index is not None:
+        return list(index.prerequisite_chain(quest_id))
+
     if quest_id not in quests:
         raise QuestNotFoundError("Quest not found.")
 
     chain = []
+    seen = set()
     current = quest_id
 
     while True:
         if current not in quests:
             raise QuestNotFoundError("Invalid quest in chain.")
 
-        chain.insert(0, current)
+        # bad data could loop forever without this
+        if current in seen:
+            raise InvalidDataFormatError(f"Prerequisite cycle at quest: {current}")
+        seen.add(current)
+
+        chain.append(current)
 
         prereq = quests[current]["prerequisite"]
         if prereq == "NONE":
@@ -172,6 +194,7 @@ def get_quest_prerequisite_chain(quest_id, quests):
 
         current = prereq
 
+    chain.reverse()
     return chain
 
 
@@ -196,7 +219,10 @@ def get_total_quest_rewards_earned(character, quests):
     return {"total_xp": xp_total, "total_gold": gold_total}
 
 
-def get_quests_by_level(quests, min_level, max_level):
+def get_quests_by_level(quests, min_level, max_level, index=None):
+    if index is not None:
+        return [quests[qid] for qid in index.quest_ids_for_levels(min_level, max_level)]
+
     return [
         q for q in quests.values()
         if min_level <= q["required_level"] <= max_level
@@ -231,8 +257,275 @@ def validate_quest_prerequisites(quests):
         prereq = quest["prerequisite"]
         if prereq != "NONE" and prereq not in quests:
             raise QuestNotFoundError("Invalid prerequisite found.")
+
+    cycle = find_prerequisite_cycle(quests)
+    if cycle is not None:
+        raise InvalidDataFormatError(f"Prerequisite cycle: {' -> '.join(cycle)}")
+
     return True
 
+
+def find_prerequisite_cycle(quests):
+    """Return the quest IDs of one prerequisite cycle, or None if there is none"""
+    # every quest is walked at most once across all the chains
+    finished = set()
+
+    for start in quests:
+        path = []
+        on_path = {}
+        current = start
+
+        while current in quests and current not in finished:
+            if current in on_path:
+                return path[on_path[current]:] + [current]
+
+            on_path[current] = len(path)
+            path.append(current)
+            current = quests[current].get("prerequisite", "NONE")
+
+        finished.update(path)
+
+    return None
+
+# ============================================================================
+# QUEST INDEX
+# ============================================================================
+
+def quest_id_lookup(quest_ids):
+    # QuestLog already has set speed lookups, plain lists get copied to a set
+    if isinstance(quest_ids, QuestLog):
+        return quest_ids
+    return set(quest_ids)
+
+
+class QuestChain:
+    """
+    Read-only view of the first length quest IDs of a shared list
+
+    A quest line keeps one list of IDs and each quest's chain is a view of
+    its start, so handing a chain out does not copy it.
+    """
+    __slots__ = ("ids", "length")
+
+    def __init__(self, ids, length):
+        self.ids = ids
+        self.length = length
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        return islice(self.ids, self.length)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return tuple(self.ids[j] for j in range(*i.indices(self.length)))
+        if i < 0:
+            i += self.length
+        if not 0 <= i < self.length:
+            raise IndexError("quest chain index out of range")
+        return self.ids[i]
+
+    def __contains__(self, quest_id):
+        return quest_id in iter(self)
+
+    def __eq__(self, other):
+        if isinstance(other, (QuestChain, tuple, list)):
+            return self.length == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self):
+        return f"QuestChain({list(self)!r})"
+
+
+class QuestIndex:
+    """
+    Prerequisite graph for a quest catalog, built once per catalog
+
+    Holds the quests with no prerequisite, a map from each quest to the
+    quests that unlock when it is completed, and level buckets. A quest
+    can only be available if it is a root or a dependent of a completed
+    quest, so availability checks only look at those instead of the whole
+    catalog.
+    """
+
+    def __init__(self, quests):
+        self.quests = quests
+        self.position = {}
+        self.roots = []
+        self.dependents = {}
+        self.by_level = {}
+
+        for i, (qid, quest) in enumerate(quests.items()):
+            self.position[qid] = i
+
+            prereq = quest.get("prerequisite", "NONE")
+            if prereq == "NONE":
+                self.roots.append(qid)
+            else:
+                self.dependents.setdefault(prereq, []).append(qid)
+
+            self.by_level.setdefault(quest["required_level"], []).append(qid)
+
+        self.levels = sorted(self.by_level)
+
+        # roots sorted by level so low level characters stop early
+        self.roots.sort(key=lambda qid: quests[qid]["required_level"])
+
+        # bad content fails here, when the catalog is loaded, so callers
+        # do not need to check the prerequisites again
+        validate_quest_prerequisites(quests)
+
+        # quest_id -> QuestChain over a shared list. a quest line shares one
+        # list, so a line of N quests stores N IDs instead of N * N / 2.
+        # filled in when asked for
+        self.chains = {}
+
+    def candidate_quest_ids(self, character):
+        """Quests whose prerequisite is met, ignoring level and quest state"""
+        level = character["level"]
+        for qid in self.roots:
+            if self.quests[qid]["required_level"] > level:
+                break
+            yield qid
+
+        for done in character["completed_quests"]:
+            for qid in self.dependents.get(done, []):
+                yield qid
+
+    def available_quest_ids(self, character):
+        """Quest IDs the character can accept, in catalog order"""
+        level = character["level"]
+        completed = quest_id_lookup(character["completed_quests"])
+        active = quest_id_lookup(character["active_quests"])
+
+        available = set()
+        for qid in self.candidate_quest_ids(character):
+            if qid in completed or qid in active:
+                continue
+            if self.quests[qid]["required_level"] > level:
+                continue
+            available.add(qid)
+
+        return sorted(available, key=self.position.get)
+
+    def prerequisite_chain(self, quest_id):
+        """
+        Read-only QuestChain of quest IDs from the first prerequisite down
+        to quest_id
+
+        Every chain worked out along the way is cached, so after the first
+        lookup a quest (and everything before it) is a dictionary lookup.
+        """
+        chain = self.chains.get(quest_id)
+        if chain is not None:
+            return chain
+
+        if quest_id not in self.quests:
+            raise QuestNotFoundError("Quest not found.")
+
+        # walk up until reaching a cached chain or a quest with no prerequisite
+        path = []
+        current = quest_id
+        while True:
+            if current not in self.quests:
+                raise QuestNotFoundError("Invalid quest in chain.")
+
+            path.append(current)
+            prereq = self.quests[current].get("prerequisite", "NONE")
+            if prereq == "NONE":
+                ids, length = [], 0
+                break
+            if prereq in self.chains:
+                ids, length = self.chains[prereq].ids, self.chains[prereq].length
+                break
+            current = prereq
+
+        for qid in reversed(path):
+            # a list is extended in place only by the quest right after its
+            # end, a second branch from the same quest gets its own copy
+            if len(ids) != length:
+                ids = ids[:length]
+            ids.append(qid)
+            length += 1
+            self.chains[qid] = QuestChain(ids, length)
+
+        return self.chains[quest_id]
+
+    def quest_ids_for_levels(self, min_level, max_level):
+        ids = []
+        for level in self.levels[bisect_left(self.levels, min_level):bisect_right(self.levels, max_level)]:
+            ids.extend(self.by_level[level])
+        return ids
+
+
+class AvailableQuestTracker:
+    """
+    Keeps one character's available quests up to date as they play
+
+    Accepting, abandoning and completing quests through the tracker only
+    touches the quests affected by that action. Quests that are unlocked
+    but still above the character's level wait in a heap until a level up.
+    """
+
+    def __init__(self, character, quests, index=None):
+        self.character = character
+        self.quests = quests
+        self.index = index if index is not None else QuestIndex(quests)
+
+        self.available = set(self.index.available_quest_ids(character))
+        self.locked = []
+
+        completed = quest_id_lookup(character["completed_quests"])
+        active = quest_id_lookup(character["active_quests"])
+        for qid in self.index.candidate_quest_ids(character):
+            level = quests[qid]["required_level"]
+            if qid not in completed and qid not in active and level > character["level"]:
+                heapq.heappush(self.locked, (level, qid))
+
+        # roots above the character's level are never yielded as candidates
+        for qid in self.index.roots:
+            level = quests[qid]["required_level"]
+            if level > character["level"]:
+                heapq.heappush(self.locked, (level, qid))
+
+    def available_quests(self):
+        """Return full quest data for available quests in catalog order"""
+        ids = sorted(self.available, key=self.index.position.get)
+        return [self.quests[qid] for qid in ids]
+
+    def accept(self, quest_id):
+        accept_quest(self.character, quest_id, self.quests)
+        self.available.discard(quest_id)
+        return True
+
+    def abandon(self, quest_id):
+        abandon_quest(self.character, quest_id)
+        if can_accept_quest(self.character, quest_id, self.quests):
+            self.available.add(quest_id)
+        return True
+
+    def complete(self, quest_id):
+        rewards = complete_quest(self.character, quest_id, self.quests)
+
+        for qid in self.index.dependents.get(quest_id, []):
+            if can_accept_quest(self.character, qid, self.quests):
+                self.available.add(qid)
+            elif self.quests[qid]["required_level"] > self.character["level"]:
+                heapq.heappush(self.locked, (self.quests[qid]["required_level"], qid))
+
+        # rewards may have levelled the character up
+        self.level_changed()
+        return rewards
+
+    def level_changed(self):
+        """Release quests that were only waiting on the character's level"""
+        while self.locked and self.locked[0][0] <= self.character["level"]:
+            level, qid = heapq.heappop(self.locked)
+            if can_accept_quest(self.character, qid, self.quests):
+                self.available.add(qid)
+
+
 # ============================================================================
 # TESTING
 # ============================================================================
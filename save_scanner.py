@@ -0,0 +1,144 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Save Scanner Module
+
+Name: Ajani Davis
+
+Checks every save file in a directory with the same parsing and
+validation load_character uses, spread over a pool of processes, and
+reports the bad ones before a player runs into them. Bad saves can
+optionally be moved into a quarantine folder.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from custom_exceptions import (
+    InvalidSaveDataError,
+    MissingSaveFieldError,
+    InvalidSaveFieldTypeError
+)
+from character_manager import parse_save_data, record_deletion
+
+SAVE_SUFFIX = "_save.txt"
+
+# every status a scanned save can get
+SCAN_STATUSES = ["ok", "unreadable", "corrupt", "missing_field", "wrong_type"]
+
+
+def check_save_file(path):
+    """
+    Parse and validate one save file
+
+    Returns: dictionary with file, name, status (one of SCAN_STATUSES) and
+             message
+    """
+    filename = os.path.basename(path)
+    name = filename[:-len(SAVE_SUFFIX)]
+    result = {"file": path, "name": name, "status": "ok", "message": ""}
+
+    try:
+        with open(path, "r") as f:
+            lines = f.readlines()
+    except (OSError, UnicodeDecodeError) as e:
+        result["status"] = "unreadable"
+        result["message"] = str(e)
+        return result
+
+    try:
+        character = parse_save_data(lines)
+    except MissingSaveFieldError as e:
+        result["status"] = "missing_field"
+        result["message"] = str(e)
+        return result
+    except InvalidSaveFieldTypeError as e:
+        result["status"] = "wrong_type"
+        result["message"] = str(e)
+        return result
+    except InvalidSaveDataError as e:
+        result["status"] = "corrupt"
+        result["message"] = str(e)
+        return result
+
+    # load_character finds saves by file name, so it must match the save
+    if character["name"] != name:
+        result["status"] = "corrupt"
+        result["message"] = f"save is for {character['name']}, not {name}"
+
+    return result
+
+
+def quarantine_target(quarantine_directory, filename):
+    """
+    Path in quarantine_directory to move a save called filename to
+
+    A save quarantined earlier under the same name is kept, and the new
+    one gets a counter: Name_save.txt, Name_save.1.txt, Name_save.2.txt...
+    """
+    target = os.path.join(quarantine_directory, filename)
+    stem = filename[:-len(".txt")]
+    count = 0
+    while os.path.exists(target):
+        count += 1
+        target = os.path.join(quarantine_directory, f"{stem}.{count}.txt")
+    return target
+
+
+def scan_save_directory(save_directory="data/save_games", workers=None,
+                        quarantine_directory=None, chunksize=64):
+    """
+    Check every save file in save_directory
+
+    Args:
+        save_directory: folder of <name>_save.txt files
+        workers: number of processes (None uses every core, 1 runs here)
+        quarantine_directory: if given, bad saves are moved here
+        chunksize: files handed to a worker at a time
+
+    Returns: dictionary with scanned (count), counts (per status),
+             problems (result of every bad save), quarantined (paths) and
+             failed (bad saves that could not be moved, with the error)
+    """
+    paths = []
+    if os.path.exists(save_directory):
+        with os.scandir(save_directory) as entries:
+            for entry in entries:
+                if entry.name.endswith(SAVE_SUFFIX) and entry.is_file():
+                    paths.append(entry.path)
+    paths.sort()
+
+    if workers == 1:
+        results = list(map(check_save_file, paths))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(check_save_file, paths, chunksize=chunksize))
+
+    report = {
+        "scanned": len(results),
+        "counts": {status: 0 for status in SCAN_STATUSES},
+        "problems": [],
+        "quarantined": [],
+        "failed": []
+    }
+
+    for result in results:
+        report["counts"][result["status"]] += 1
+        if result["status"] != "ok":
+            report["problems"].append(result)
+
+    if quarantine_directory is not None and report["problems"]:
+        if not os.path.exists(quarantine_directory):
+            os.makedirs(quarantine_directory)
+
+        for result in report["problems"]:
+            target = quarantine_target(quarantine_directory, os.path.basename(result["file"]))
+            # one save that cannot be moved does not stop the others
+            try:
+                os.replace(result["file"], target)
+            except OSError as e:
+                report["failed"].append({"file": result["file"], "name": result["name"], "message": str(e)})
+                continue
+            record_deletion(save_directory, result["name"])
+            report["quarantined"].append(target)
+
+    return report
@@ -0,0 +1,137 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Save Store Module
+
+Name: Ajani Davis
+
+Keeps every saved character in one SQLite database file instead of one
+text file per character. Characters are stored in the same text format
+as character_manager save files and are looked up by name through the
+table's primary key, so loading, saving and deleting never scan the
+other saves.
+"""
+
+import os
+import sqlite3
+
+from custom_exceptions import (
+    CharacterNotFoundError,
+    SaveFileCorruptedError
+)
+from character_manager import (
+    format_save_data,
+    parse_save_data,
+    list_saved_characters,
+    load_character
+)
+
+
+class SaveStore:
+    def __init__(self, path="data/save_games/saves.db"):
+        folder = os.path.dirname(path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+
+        self.path = path
+        try:
+            self.connection = sqlite3.connect(path)
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS characters ("
+                "name TEXT PRIMARY KEY, "
+                "data TEXT NOT NULL"
+                ") WITHOUT ROWID"
+            )
+            self.connection.commit()
+        except sqlite3.Error:
+            raise SaveFileCorruptedError(f"could not open save store: {path}")
+
+    def save_character(self, character):
+        try:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO characters (name, data) VALUES (?, ?)",
+                (character["name"], format_save_data(character))
+            )
+            self.connection.commit()
+        except sqlite3.Error:
+            raise IOError("error saving character to store")
+        return True
+
+    def save_characters(self, characters):
+        # one transaction, so the whole batch is committed together
+        rows = [(character["name"], format_save_data(character)) for character in characters]
+        try:
+            with self.connection:
+                self.connection.executemany(
+                    "INSERT OR REPLACE INTO characters (name, data) VALUES (?, ?)",
+                    rows
+                )
+        except sqlite3.Error:
+            raise IOError("error saving characters to store")
+        return True
+
+    def load_character(self, character_name):
+        try:
+            row = self.connection.execute(
+                "SELECT data FROM characters WHERE name = ?",
+                (character_name,)
+            ).fetchone()
+        except sqlite3.Error:
+            raise SaveFileCorruptedError("could not read save store")
+
+        if row is None:
+            raise CharacterNotFoundError(f"no save for: {character_name}")
+
+        return parse_save_data(row[0].splitlines())
+
+    def list_saved_characters(self, offset=0, limit=None):
+        # names come back sorted, one page at a time when limit is given
+        if limit is None:
+            limit = -1
+
+        rows = self.connection.execute(
+            "SELECT name FROM characters ORDER BY name LIMIT ? OFFSET ?",
+            (limit, offset)
+        ).fetchall()
+
+        return [row[0] for row in rows]
+
+    def count_characters(self):
+        return self.connection.execute("SELECT COUNT(*) FROM characters").fetchone()[0]
+
+    def delete_character(self, character_name):
+        try:
+            cursor = self.connection.execute(
+                "DELETE FROM characters WHERE name = ?",
+                (character_name,)
+            )
+            self.connection.commit()
+        except sqlite3.Error:
+            raise SaveFileCorruptedError("could not delete save")
+
+        if cursor.rowcount == 0:
+            raise CharacterNotFoundError(f"no save for: {character_name}")
+
+        return True
+
+    def import_save_directory(self, save_directory="data/save_games"):
+        """Copy every <name>_save.txt file into the store, returns how many"""
+        count = 0
+        for name in list_saved_characters(save_directory):
+            character = load_character(name, save_directory)
+            self.connection.execute(
+                "INSERT OR REPLACE INTO characters (name, data) VALUES (?, ?)",
+                (character["name"], format_save_data(character))
+            )
+            count += 1
+
+        self.connection.commit()
+        return count
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -37,6 +37,31 @@ def test_character_dead_exception():
     with pytest.raises(CharacterDeadError):
         character_manager.gain_experience(char, 50)
 
+def test_corrupted_binary_save_exception():
+    """Test that damaged binary saves raise SaveFileCorruptedError"""
+    import binary_saves
+
+    data = binary_saves.encode_character(character_manager.create_character("Test", "Rogue"))
+
+    with pytest.raises(SaveFileCorruptedError):
+        binary_saves.decode_character(data[:-5])
+
+    with pytest.raises(SaveFileCorruptedError):
+        binary_saves.decode_character(b"JUNK" + data[4:])
+
+def test_invalid_export_row_exception(tmp_path):
+    """Test that bad rows in an export file raise InvalidSaveDataError"""
+    import character_export
+
+    export_file = tmp_path / "characters.csv"
+    export_file.write_text(
+        ",".join(character_manager.SAVE_FIELDS) + "\n"
+        "Bad,Warrior,one,120,120,15,5,0,100,,,\n"
+    )
+
+    with pytest.raises(InvalidSaveDataError):
+        list(character_export.iter_exported_characters(str(export_file)))
+
 # ============================================================================
 # INVENTORY EXCEPTION TESTS
 # ============================================================================
@@ -139,6 +164,23 @@ def test_quest_not_active_exception():
     with pytest.raises(QuestNotActiveError):
         quest_handler.complete_quest(char, "test_quest", quests)
 
+def test_quest_prerequisite_cycle_exception():
+    """Test that prerequisite cycles are reported instead of looping forever"""
+    quests = {
+        'a': {'quest_id': 'a', 'required_level': 1, 'prerequisite': 'c'},
+        'b': {'quest_id': 'b', 'required_level': 1, 'prerequisite': 'a'},
+        'c': {'quest_id': 'c', 'required_level': 1, 'prerequisite': 'b'}
+    }
+
+    with pytest.raises(InvalidDataFormatError):
+        quest_handler.validate_quest_prerequisites(quests)
+
+    with pytest.raises(InvalidDataFormatError):
+        quest_handler.get_quest_prerequisite_chain('b', quests)
+
+    with pytest.raises(InvalidDataFormatError):
+        quest_handler.QuestIndex(quests)
+
 # ============================================================================
 # GAME DATA EXCEPTION TESTS
 # ============================================================================
@@ -160,6 +202,17 @@ def test_invalid_data_format_exception():
     finally:
         os.remove("test_bad_data.txt")
 
+def test_unknown_effect_stat_fails_at_load(tmp_path):
+    """Test that an item effect naming an unknown stat is rejected at load"""
+    item_file = tmp_path / "items.txt"
+    item_file.write_text(
+        "ITEM_ID: typo_ring\nNAME: Typo Ring\nTYPE: armor\n"
+        "EFFECT: strenght:5\nCOST: 10\nDESCRIPTION: Misspelled.\n"
+    )
+
+    with pytest.raises(InvalidDataFormatError):
+        game_data.load_items(str(item_file))
+
 # ============================================================================
 # COMBAT EXCEPTION TESTS
 # ============================================================================
@@ -14,6 +14,14 @@ import inventory_system
 import quest_handler
 import combat_system
 import game_data
+import battle_simulator
+import save_store
+import character_roster
+import binary_saves
+import async_saves
+import character_export
+import save_scanner
+import leaderboard
 
 # ============================================================================
 # CHARACTER INTEGRATION TESTS
@@ -40,6 +48,25 @@ def test_character_creation_and_saving():
     # Cleanup
     character_manager.delete_character("IntegrationTest")
 
+def test_character_record_works_like_a_dict():
+    """Test that the slotted Character supports dictionary style access"""
+    char = character_manager.create_character("SlotTest", "Rogue")
+
+    assert isinstance(char, character_manager.Character)
+    assert not hasattr(char, '__dict__')
+    assert char['class'] == "Rogue"
+    assert 'equipped_weapon' not in char
+    assert char.get('equipped_weapon') is None
+
+    char['gold'] += 5
+    char['equipped_weapon'] = "iron_sword"
+    assert char['gold'] == 105
+    assert 'equipped_weapon' in char
+    assert dict(char)['equipped_weapon'] == "iron_sword"
+
+    with pytest.raises(KeyError):
+        char['not_a_field'] = 1
+
 def test_character_leveling_system():
     """Test that character leveling works correctly"""
     char = character_manager.create_character("LevelTest", "Mage")
@@ -54,6 +81,57 @@ def test_character_leveling_system():
     assert char['max_health'] > original_health
     assert char['health'] == char['max_health']  # Health restored on level up
 
+def test_roster_bulk_events_match_single_updates():
+    """Test that roster bulk events match the per-character functions"""
+    roster_chars = []
+    single_chars = []
+    for i, char_class in enumerate(["Warrior", "Mage", "Rogue", "Cleric"] * 3):
+        for group in (roster_chars, single_chars):
+            char = character_manager.create_character(f"Roster{i}", char_class)
+            char['health'] = 0 if i % 4 == 0 else char['health'] - 30
+            group.append(char)
+
+    roster = character_roster.CharacterRoster(roster_chars)
+    roster.grant_experience(350)
+    assert roster.revive_all_dead() == 3
+    roster.heal_all(20)
+    roster.add_gold_all(15)
+    roster.write_back()
+
+    for char in single_chars:
+        if char['health'] > 0:
+            character_manager.gain_experience(char, 350)
+        if character_manager.is_character_dead(char):
+            character_manager.revive_character(char)
+        character_manager.heal_character(char, 20)
+        character_manager.add_gold(char, 15)
+
+    for a, b in zip(roster_chars, single_chars):
+        assert dict(a) == dict(b)
+
+    with pytest.raises(ValueError):
+        roster.add_gold_all(-1000)
+
+def test_large_xp_award_levels_in_one_step():
+    """Test that a big XP award gives every level and stat gain at once"""
+    char = character_manager.create_character("BigXPTest", "Mage")
+
+    # levels 1-9 cost 100 + 200 + ... + 900 = 4500 XP
+    character_manager.gain_experience(char, 4550)
+
+    assert char['level'] == 10
+    assert char['experience'] == 50
+    assert char['max_health'] == 80 + 9 * 10
+    assert char['strength'] == 8 + 9 * 2
+    assert char['health'] == char['max_health']
+
+    alive = character_manager.create_character("BatchAlive", "Warrior")
+    dead = character_manager.create_character("BatchDead", "Warrior")
+    dead['health'] = 0
+    assert character_manager.gain_experience_batch([alive, dead], 300) == 1
+    assert alive['level'] == 3
+    assert dead['level'] == 1
+
 def test_character_gold_management():
     """Test adding and spending gold"""
     char = character_manager.create_character("GoldTest", "Rogue")
@@ -69,6 +147,253 @@ def test_character_gold_management():
     with pytest.raises(ValueError):
         character_manager.add_gold(char, -1000)
 
+def test_batch_save_is_atomic(tmp_path):
+    """Test batch saving and that a failed save keeps the old file"""
+    folder = str(tmp_path)
+    chars = [character_manager.create_character(f"Batch{i}", "Rogue") for i in range(5)]
+
+    assert character_manager.save_characters(chars, folder) == True
+    expected = sorted([f"Batch{i}_save.txt" for i in range(5)] + [character_manager.INDEX_FILE])
+    assert sorted(os.listdir(folder)) == expected
+
+    # a save that fails part way must not touch the existing file
+    broken = character_manager.create_character("Batch0", "Rogue")
+    broken['inventory'] = [None]
+    with pytest.raises(IOError):
+        character_manager.save_character(broken, folder)
+
+    assert character_manager.load_character("Batch0", folder)['inventory'] == []
+    assert sorted(os.listdir(folder)) == expected
+
+@pytest.mark.skipif(os.name == "nt", reason="unix file permissions")
+def test_saves_keep_normal_file_permissions(tmp_path):
+    """Test that atomic saves are not left with the temp file's 0600 mode"""
+    folder = str(tmp_path)
+    char = character_manager.create_character("PermTest", "Mage")
+    filename = os.path.join(folder, "PermTest_save.txt")
+
+    character_manager.save_character(char, folder)
+    assert os.stat(filename).st_mode & 0o777 == 0o666 & ~character_manager.UMASK
+
+    # an existing save keeps the permissions it was given
+    os.chmod(filename, 0o640)
+    character_manager.save_character(char, folder)
+    assert os.stat(filename).st_mode & 0o777 == 0o640
+
+def test_character_summary_index(tmp_path):
+    """Test that the summary index follows saves and deletes"""
+    folder = str(tmp_path)
+
+    # saves written before the index existed are picked up
+    old = character_manager.create_character("Old", "Mage")
+    with open(os.path.join(folder, "Old_save.txt"), "w") as f:
+        f.write(character_manager.format_save_data(old))
+
+    rich = character_manager.create_character("Rich", "Rogue")
+    rich['gold'] = 500
+    character_manager.save_character(rich, folder)
+    character_manager.save_character(character_manager.create_character("Poor", "Warrior"), folder)
+
+    summaries = character_manager.list_character_summaries(folder)
+    assert [s['name'] for s in summaries] == ["Old", "Poor", "Rich"]
+    assert summaries[2]['class'] == "Rogue"
+
+    rich['level'] = 3
+    character_manager.save_character(rich, folder)
+    character_manager.delete_character("Poor", folder)
+
+    by_gold = character_manager.list_character_summaries(folder, sort_by="gold", reverse=True)
+    assert [(s['name'], s['level']) for s in by_gold] == [("Rich", 3), ("Old", 1)]
+
+    # a lost index is rebuilt from the saves
+    os.remove(os.path.join(folder, character_manager.INDEX_FILE))
+    character_manager.summary_cache.clear()
+    assert [s['name'] for s in character_manager.list_character_summaries(folder)] == ["Old", "Rich"]
+
+def test_binary_save_round_trip_and_migration(tmp_path):
+    """Test that saves keep equipment and binary copies follow the text save"""
+    folder = str(tmp_path)
+    char = character_manager.create_character("BinaryTest", "Warrior")
+    for _ in range(3):
+        inventory_system.add_item_to_inventory(char, "health_potion")
+    inventory_system.add_item_to_inventory(char, "iron_sword")
+    inventory_system.equip_weapon(char, "iron_sword", {'type': 'weapon', 'effect': 'strength:5'})
+    char['completed_quests'].append("first_steps")
+
+    binary_saves.save_character_binary(char, folder)
+    loaded = binary_saves.load_character_binary("BinaryTest", folder)
+
+    assert dict(loaded) == dict(char)
+    assert loaded['equipped_weapon'] == "iron_sword"
+    assert character_manager.validate_character_data(loaded) == True
+
+    # the text save the game writes keeps the equipment too
+    assert dict(character_manager.load_character("BinaryTest", folder)) == dict(char)
+
+    # a character with only a text save is converted on first load
+    old = character_manager.create_character("TextOnly", "Mage")
+    character_manager.save_character(old, folder)
+    assert binary_saves.migrate_save_directory(folder) == 1
+    assert os.path.exists(os.path.join(folder, "TextOnly_save.dat"))
+    assert dict(binary_saves.load_character_binary("TextOnly", folder)) == dict(old)
+
+    # a text save removes the out of date binary copy
+    old['gold'] = 999
+    character_manager.save_character(old, folder)
+    assert not os.path.exists(os.path.join(folder, "TextOnly_save.dat"))
+    assert binary_saves.load_character_binary("TextOnly", folder)['gold'] == 999
+    assert os.path.exists(os.path.join(folder, "TextOnly_save.dat"))
+
+    # deleting a character removes both saves
+    character_manager.delete_character("TextOnly", folder)
+    assert not os.path.exists(os.path.join(folder, "TextOnly_save.dat"))
+    from custom_exceptions import CharacterNotFoundError
+    with pytest.raises(CharacterNotFoundError):
+        binary_saves.load_character_binary("TextOnly", folder)
+
+def test_write_behind_save_cache(tmp_path):
+    """Test that the save cache coalesces saves and skips unchanged ones"""
+    folder = str(tmp_path)
+    flushed = []
+    cache = character_manager.SaveCache(folder, on_flush=flushed.extend)
+    char = character_manager.create_character("CacheTest", "Mage")
+
+    cache.save(char)
+    char['gold'] += 10
+    cache.save(char)
+    assert os.listdir(folder) == []
+
+    assert cache.flush() == 1
+    assert [(s['name'], s['gold']) for s in flushed] == [("CacheTest", 110)]
+    assert character_manager.load_character("CacheTest", folder)['gold'] == 110
+
+    # nothing changed, nothing written
+    cache.save(char)
+    assert cache.flush() == 0
+
+    char['inventory'].append("health_potion")
+    assert cache.dirty_fields(char) == ['inventory']
+    cache.save(char)
+    cache.stop()
+    assert character_manager.load_character("CacheTest", folder)['inventory'] == ["health_potion"]
+
+    # only what the character looked like at save() is written
+    cache.save(char)
+    char['gold'] = 0
+    cache.flush()
+    assert character_manager.load_character("CacheTest", folder)['gold'] == 110
+
+    # deleting a character drops its pending save
+    cache.save(char)
+    character_manager.delete_character("CacheTest", folder)
+    assert cache.flush() == 0
+    assert "CacheTest" not in character_manager.list_saved_characters(folder)
+
+def test_async_save_manager(tmp_path):
+    """Test concurrent async saves and loads"""
+    import asyncio
+
+    async def run_sessions():
+        async with async_saves.AsyncSaveManager(str(tmp_path), max_workers=4) as saves:
+            chars = [character_manager.create_character(f"Async{i}", "Cleric") for i in range(10)]
+            await asyncio.gather(*[saves.save_character(char) for char in chars])
+
+            # many writes to one character never interleave
+            hero = chars[0]
+            writes = []
+            for gold in range(20):
+                hero['gold'] = gold
+                writes.append(saves.save_character(hero))
+            await asyncio.gather(*writes)
+
+            names = sorted(await saves.list_saved_characters())
+            loaded = await saves.load_characters(names)
+            await saves.delete_character("Async1")
+            return names, loaded, await saves.list_saved_characters()
+
+    names, loaded, remaining = asyncio.run(run_sessions())
+
+    assert len(names) == 10
+    assert [char['name'] for char in loaded] == names
+    assert loaded[0]['gold'] == 19
+    assert "Async1" not in remaining
+
+def test_bulk_export_and_import(tmp_path):
+    """Test exporting a save directory to one file and importing it back"""
+    source = str(tmp_path / "source")
+    target = str(tmp_path / "target")
+    export_file = str(tmp_path / "characters.csv")
+
+    chars = []
+    for i in range(7):
+        char = character_manager.create_character(f"Export{i}", "Warrior")
+        char['gold'] = i * 10
+        char['inventory'].append("health_potion")
+        char['completed_quests'].append("first_steps")
+        chars.append(char)
+    character_manager.save_characters(chars, source)
+
+    assert character_export.export_characters(export_file, source) == 7
+    batches = list(character_export.iter_exported_characters(export_file, batch_size=3))
+    assert [len(batch) for batch in batches] == [3, 3, 1]
+
+    assert character_export.import_characters(export_file, target) == 7
+    for char in chars:
+        assert dict(character_manager.load_character(char['name'], target)) == dict(char)
+
+def test_save_scanner_reports_and_quarantines(tmp_path):
+    """Test that the scanner sorts bad saves by problem and moves them"""
+    folder = tmp_path / "saves"
+    quarantine = tmp_path / "quarantine"
+
+    good = character_manager.create_character("Good", "Mage")
+    character_manager.save_character(good, str(folder))
+    text = character_manager.format_save_data(good)
+
+    (folder / "NoGold_save.txt").write_text(text.replace("Good", "NoGold").replace("GOLD: 100\n", ""))
+    (folder / "BadLevel_save.txt").write_text(text.replace("Good", "BadLevel").replace("LEVEL: 1", "LEVEL: one"))
+    (folder / "Garbage_save.txt").write_text("this is not a save\n")
+
+    report = save_scanner.scan_save_directory(str(folder), workers=2, quarantine_directory=str(quarantine))
+
+    assert report['scanned'] == 4
+    assert report['counts']['ok'] == 1
+    assert report['counts']['missing_field'] == 1
+    assert report['counts']['wrong_type'] == 1
+    assert report['counts']['corrupt'] == 1
+    assert sorted(os.listdir(quarantine)) == ["BadLevel_save.txt", "Garbage_save.txt", "NoGold_save.txt"]
+    assert sorted(os.listdir(folder)) == ["Good_save.txt", character_manager.INDEX_FILE]
+    assert report['failed'] == []
+
+    # a second bad save with the same name does not replace the first one
+    (folder / "Garbage_save.txt").write_text("still not a save\n")
+    report = save_scanner.scan_save_directory(str(folder), workers=1, quarantine_directory=str(quarantine))
+    assert report['quarantined'] == [str(quarantine / "Garbage_save.1.txt")]
+    assert (quarantine / "Garbage_save.txt").read_text() == "this is not a save\n"
+    assert (quarantine / "Garbage_save.1.txt").read_text() == "still not a save\n"
+
+def test_save_store_round_trip(tmp_path):
+    """Test saving, paging, loading and deleting through the save store"""
+    from custom_exceptions import CharacterNotFoundError
+
+    with save_store.SaveStore(str(tmp_path / "saves.db")) as store:
+        for name in ["Cara", "Abe", "Bo"]:
+            char = character_manager.create_character(name, "Cleric")
+            char['inventory'].append("health_potion")
+            store.save_character(char)
+
+        assert store.count_characters() == 3
+        assert store.list_saved_characters() == ["Abe", "Bo", "Cara"]
+        assert store.list_saved_characters(offset=1, limit=1) == ["Bo"]
+
+        loaded = store.load_character("Bo")
+        assert loaded['class'] == "Cleric"
+        assert loaded['inventory'] == ["health_potion"]
+
+        store.delete_character("Bo")
+        with pytest.raises(CharacterNotFoundError):
+            store.load_character("Bo")
+
 # ============================================================================
 # INVENTORY INTEGRATION TESTS
 # ============================================================================
@@ -104,6 +429,26 @@ def test_equipment_system():
     assert 'equipped_weapon' in char
     assert char['equipped_weapon'] == "iron_sword"
 
+def test_compiled_item_effects():
+    """Test that loaded items carry compiled effects with several stats"""
+    items = game_data.load_items("data/items.txt")
+    assert items['iron_sword']['modifiers'] == (("strength", 5),)
+
+    char = character_manager.create_character("EffectTest", "Mage")
+    original_strength = char['strength']
+    original_magic = char['magic']
+
+    staff = {'type': 'weapon', 'effect': 'strength:2, magic:6'}
+    inventory_system.add_item_to_inventory(char, "battle_staff")
+    inventory_system.equip_weapon(char, "battle_staff", staff)
+
+    assert char['strength'] == original_strength + 2
+    assert char['magic'] == original_magic + 6
+
+    inventory_system.unequip_weapon(char)
+    assert char['strength'] == original_strength
+    assert char['magic'] == original_magic
+
 def test_shop_system():
     """Test buying and selling items"""
     char = character_manager.create_character("ShopTest", "Mage")
@@ -123,6 +468,25 @@ def test_shop_system():
     assert gold_received == 12  # Half of cost (25 // 2)
     assert "health_potion" not in char['inventory']
 
+def test_counted_inventory():
+    """Test that the counted inventory behaves like the old item list"""
+    char = character_manager.create_character("StackTest", "Warrior")
+
+    for _ in range(5):
+        inventory_system.add_item_to_inventory(char, "health_potion")
+    inventory_system.add_item_to_inventory(char, "iron_sword")
+
+    assert inventory_system.count_item(char, "health_potion") == 5
+    assert inventory_system.get_inventory_space_remaining(char) == inventory_system.MAX_INVENTORY_SIZE - 6
+
+    inventory_system.remove_item_from_inventory(char, "iron_sword")
+    assert not inventory_system.has_item(char, "iron_sword")
+    assert char['inventory'] == ["health_potion"] * 5
+
+    removed = inventory_system.clear_inventory(char)
+    assert removed == ["health_potion"] * 5
+    assert len(char['inventory']) == 0
+
 # ============================================================================
 # QUEST INTEGRATION TESTS
 # ============================================================================
@@ -158,6 +522,103 @@ def test_quest_acceptance_and_completion():
     assert char['experience'] == original_xp + 50
     assert char['gold'] == original_gold + 25
 
+def test_leaderboard_follows_events_and_persists(tmp_path):
+    """Test that the leaderboard updates from game events and survives a restart"""
+    folder = str(tmp_path)
+    board = leaderboard.Leaderboard(folder)
+    character_manager.add_character_listener(board.update)
+
+    try:
+        chars = [character_manager.create_character(name, "Warrior") for name in ["Ann", "Bo", "Cy"]]
+        for char in chars:
+            board.update(char)
+
+        character_manager.gain_experience(chars[1], 250)
+        character_manager.add_gold(chars[2], 500)
+
+        quests = {'q': {'quest_id': 'q', 'title': 'Q', 'description': 'A test', 'reward_xp': 0,
+                        'reward_gold': 0, 'required_level': 1, 'prerequisite': 'NONE'}}
+        quest_handler.accept_quest(chars[0], 'q', quests)
+        quest_handler.complete_quest(chars[0], 'q', quests)
+    finally:
+        character_manager.remove_character_listener(board.update)
+
+    assert board.top("level", 1) == [("Bo", 2)]
+    assert board.score_of("Bo", "experience") == 250
+    assert board.rank_of("Cy", "gold") == 1
+    assert board.rank_of("Ann", "completed_quests") == 1
+    # equal scores share a rank
+    assert board.rank_of("Ann", "level") == board.rank_of("Cy", "level") == 2
+
+    # only what the save cache writes reaches the leaderboard file
+    cache = character_manager.SaveCache(folder, on_flush=board.record_saved)
+    for char in chars:
+        cache.save(char)
+    cache.flush()
+    chars[0]['gold'] = 10 ** 6
+    board.update(chars[0])
+
+    restored = leaderboard.Leaderboard(folder)
+    assert restored.score_of("Ann", "gold") == 100
+    assert restored.scores == board.saved_scores
+    assert restored.rankings["gold"][0] == (-600, "Cy")
+
+    # unsaved progress can be taken back off the live rankings
+    board.revert("Ann")
+    assert board.scores == board.saved_scores
+
+    # deleting a save removes the character, and the file is updated
+    character_manager.add_deletion_listener(board.character_deleted)
+    try:
+        character_manager.delete_character("Bo", folder)
+    finally:
+        character_manager.remove_deletion_listener(board.character_deleted)
+    assert "Bo" not in board
+    assert "Bo" not in leaderboard.Leaderboard(folder)
+
+    # a save deleted while no leaderboard was running is dropped on load
+    character_manager.delete_character("Cy", folder)
+    assert "Cy" not in leaderboard.Leaderboard(folder)
+
+    # with no leaderboard file it is built from the saves
+    os.remove(os.path.join(folder, leaderboard.LEADERBOARD_FILE))
+    rebuilt = leaderboard.Leaderboard(folder)
+    assert rebuilt.scores == {"Ann": board.scores["Ann"]}
+
+def test_complete_quest_notifies_listeners_once():
+    """Test that completing a quest is one change for the listeners"""
+    char = character_manager.create_character("NotifyTest", "Mage")
+    quests = {'q': {'quest_id': 'q', 'title': 'Q', 'description': 'A test', 'reward_xp': 50,
+                    'reward_gold': 20, 'required_level': 1, 'prerequisite': 'NONE'}}
+    quest_handler.accept_quest(char, 'q', quests)
+
+    seen = []
+    character_manager.add_character_listener(seen.append)
+    try:
+        quest_handler.complete_quest(char, 'q', quests)
+    finally:
+        character_manager.remove_character_listener(seen.append)
+
+    assert seen == [char]
+
+def test_quest_log_keeps_order_through_save(tmp_path):
+    """Test that set-backed quest lists keep their order when saved"""
+    char = character_manager.create_character("QuestLogTest", "Cleric")
+    for qid in ["c_quest", "a_quest", "b_quest"]:
+        char['completed_quests'].append(qid)
+    char['active_quests'].append("d_quest")
+
+    assert quest_handler.is_quest_completed(char, "a_quest")
+    assert quest_handler.is_quest_active(char, "d_quest")
+    quest_handler.abandon_quest(char, "d_quest")
+    assert not quest_handler.is_quest_active(char, "d_quest")
+
+    character_manager.save_character(char, str(tmp_path))
+    loaded = character_manager.load_character("QuestLogTest", str(tmp_path))
+
+    assert list(loaded['completed_quests']) == ["c_quest", "a_quest", "b_quest"]
+    assert loaded['active_quests'] == []
+
 def test_quest_prerequisite_system():
     """Test that quest prerequisites work correctly"""
     char = character_manager.create_character("PrereqTest", "Rogue")
@@ -187,6 +648,61 @@ def test_quest_prerequisite_system():
     quest_handler.accept_quest(char, 'second_quest', quests)
     assert 'second_quest' in char['active_quests']
 
+def test_quest_index_and_tracker():
+    """Test that indexed availability matches a full scan as quests complete"""
+    quests = game_data.load_quests("data/quests.txt")
+    index = quest_handler.QuestIndex(quests)
+
+    char = character_manager.create_character("IndexTest", "Warrior")
+    tracker = quest_handler.AvailableQuestTracker(char, quests, index)
+
+    for _ in range(6):
+        expected = quest_handler.get_available_quests(char, quests)
+        assert quest_handler.get_available_quests(char, quests, index) == expected
+        assert tracker.available_quests() == expected
+
+        if not expected:
+            break
+        qid = expected[0]['quest_id']
+        tracker.accept(qid)
+        tracker.complete(qid)
+
+def test_cached_prerequisite_chains():
+    """Test that indexed prerequisite chains match the plain walk"""
+    quests = game_data.load_quests("data/quests.txt")
+    index = quest_handler.QuestIndex(quests)
+
+    for qid in quests:
+        chain = quest_handler.get_quest_prerequisite_chain(qid, quests)
+        assert quest_handler.get_quest_prerequisite_chain(qid, quests, index) == chain
+        assert chain[-1] == qid
+
+    # every chain was filled in along the way
+    assert len(index.chains) == len(quests)
+
+    # a long quest line shares one list of IDs instead of a tuple per quest
+    line = {}
+    for i in range(5000):
+        line[f"q{i}"] = {'quest_id': f"q{i}", 'required_level': 1,
+                         'prerequisite': f"q{i - 1}" if i else 'NONE'}
+    line['side'] = {'quest_id': 'side', 'required_level': 1, 'prerequisite': 'q9'}
+    index = quest_handler.QuestIndex(line)
+
+    assert index.prerequisite_chain('q4999') == tuple(f"q{i}" for i in range(5000))
+    assert index.prerequisite_chain('q2') == ("q0", "q1", "q2")
+    assert index.prerequisite_chain('side') == tuple(f"q{i}" for i in range(10)) + ("side",)
+    stored = {id(chain.ids): len(chain.ids) for chain in index.chains.values()}
+    assert sum(stored.values()) == 5000 + 11
+
+    # later lookups hand out the cached read-only view, nothing is copied
+    chain = index.prerequisite_chain('q2')
+    assert index.prerequisite_chain('q2') is chain
+    assert chain[-1] == "q2" and chain[:2] == ("q0", "q1") and len(chain) == 3
+    with pytest.raises(IndexError):
+        chain[3]
+    with pytest.raises(TypeError):
+        chain[0] = "q9"
+
 # ============================================================================
 # COMBAT INTEGRATION TESTS
 # ============================================================================
@@ -222,6 +738,90 @@ def test_combat_victory_rewards():
     assert rewards['xp'] == expected_xp
     assert rewards['gold'] == expected_gold
 
+def test_headless_simulation_matches_battle():
+    """Test that simulated battles match a real SimpleBattle"""
+    char = character_manager.create_character("SimTest", "Warrior")
+    enemy = combat_system.create_enemy("orc")
+
+    stats = battle_simulator.simulate_battles(char, enemy, 50)
+
+    # the originals are untouched
+    assert char['health'] == char['max_health']
+    assert enemy['health'] == enemy['max_health']
+
+    battle = combat_system.SimpleBattle(dict(char), enemy.copy())
+    battle.log = lambda message: None
+    result = battle.start_battle()
+
+    assert stats['battles'] == 50
+    assert stats['wins'] == (50 if result['winner'] == 'player' else 0)
+    assert stats['turns'] == {battle.turn: 50}
+    assert stats['player_health_remaining'] == {battle.character['health']: 50}
+
+def test_battle_lanes_match_start_battle():
+    """Test that lane simulation gives the same result as start_battle"""
+    pairs = []
+    for char_class in ["Warrior", "Mage", "Rogue", "Cleric"]:
+        for enemy_type in ["goblin", "orc", "dragon"]:
+            char = character_manager.create_character("LaneTest", char_class)
+            pairs.append((char, combat_system.create_enemy(enemy_type)))
+
+    results = battle_simulator.simulate_battle_lanes(pairs)
+
+    for (char, enemy), result in zip(pairs, results):
+        battle = combat_system.SimpleBattle(dict(char), enemy.copy())
+        battle.log = lambda message: None
+        assert result == battle.start_battle()
+
+def test_predict_battle_matches_real_battle():
+    """Test that predicted outcomes match fought battles"""
+    for char_class in ["Warrior", "Mage", "Rogue", "Cleric"]:
+        for enemy_type in ["goblin", "orc", "dragon"]:
+            char = character_manager.create_character("PredictTest", char_class)
+            enemy = combat_system.create_enemy(enemy_type)
+
+            prediction = battle_simulator.predict_battle(char, enemy)
+
+            battle = battle_simulator.HeadlessBattle(char, enemy)
+            result = battle.start_battle()
+
+            assert prediction['winner'] == result['winner']
+            assert prediction['xp_gained'] == result['xp_gained']
+            assert prediction['turns'] == battle.turn
+            assert prediction['player_health'] == battle.character['health']
+            assert prediction['enemy_health'] == battle.enemy['health']
+
+def test_special_simulation_ends_for_every_class():
+    """Test that special-ability battles always end, even a cleric that only heals"""
+    for char_class in ["Warrior", "Mage", "Rogue", "Cleric"]:
+        for enemy_type in ["goblin", "orc", "dragon"]:
+            char = character_manager.create_character("SpecialTest", char_class)
+            enemy = combat_system.create_enemy(enemy_type)
+
+            stats = battle_simulator.simulate_battles(char, enemy, 20, action="special", seed=1)
+            ended = stats['wins'] + stats['losses'] + stats['escapes'] + stats['stalemates']
+            assert ended == 20
+            assert max(stats['turns']) <= battle_simulator.MAX_TURNS
+
+    # the cleric out-heals a goblin forever, so every fight is capped
+    cleric = character_manager.create_character("SpecialTest", "Cleric")
+    stats = battle_simulator.run_monte_carlo(cleric, combat_system.create_enemy("goblin"), 100, workers=1)
+    assert stats['stalemates'] == 100
+
+def test_monte_carlo_is_repeatable():
+    """Test that seeded Monte Carlo runs give the same answer in parallel"""
+    char = character_manager.create_character("MonteCarloTest", "Rogue")
+    enemy = combat_system.create_enemy("orc")
+
+    serial = battle_simulator.run_monte_carlo(char, enemy, 2000, seed=7, workers=1, chunk_size=500)
+    parallel = battle_simulator.run_monte_carlo(char, enemy, 2000, seed=7, workers=2, chunk_size=500)
+
+    assert serial == parallel
+    assert serial['battles'] == 2000
+    assert sum(serial['turns'].values()) == 2000
+    low, high = serial['win_rate_interval']
+    assert low <= serial['win_rate'] <= high
+
 # ============================================================================
 # DATA LOADING INTEGRATION TESTS
 # ============================================================================
@@ -249,6 +849,112 @@ def test_load_game_data():
         assert 'type' in item
         assert 'cost' in item
 
+def test_cached_game_data_tracks_source_files(tmp_path):
+    """Test that the compiled data snapshot is reused and refreshed"""
+    quest_file = tmp_path / "quests.txt"
+    item_file = tmp_path / "items.txt"
+    cache_file = str(tmp_path / "game_data.cache")
+    quest_file.write_text(open("data/quests.txt").read())
+    item_file.write_text(open("data/items.txt").read())
+
+    quests, items = game_data.load_game_data_cached(str(quest_file), str(item_file), cache_file)
+    assert quests == game_data.load_quests("data/quests.txt")
+    assert items == game_data.load_items("data/items.txt")
+    assert os.path.exists(cache_file)
+
+    # second load comes from the snapshot
+    assert game_data.load_game_data_cached(str(quest_file), str(item_file), cache_file) == (quests, items)
+
+    # changing a source file rebuilds it
+    item_file.write_text(
+        "ITEM_ID: only_item\nNAME: Only\nTYPE: consumable\n"
+        "EFFECT: health:1\nCOST: 1\nDESCRIPTION: Just one.\n"
+    )
+    quests, items = game_data.load_game_data_cached(str(quest_file), str(item_file), cache_file)
+    assert list(items) == ["only_item"]
+
+    # a snapshot that cannot be pickled leaves no temp file behind
+    game_data.write_data_cache(cache_file, {"bad": lambda: None})
+    assert sorted(os.listdir(tmp_path)) == ["game_data.cache", "items.txt", "quests.txt"]
+
+def test_streaming_quest_parser():
+    """Test that quests can be read one at a time from a file"""
+    import io
+    from custom_exceptions import InvalidDataFormatError
+
+    text = (
+        "QUEST_ID: a\nTITLE: A\nDESCRIPTION: First\nREWARD_XP: 10\n"
+        "REWARD_GOLD: 5\nREQUIRED_LEVEL: 1\nPREREQUISITE: NONE\n"
+        "\n\n\n"
+        "QUEST_ID: b\nTITLE: B\nDESCRIPTION: Second\nREWARD_XP: 20\n"
+        "REWARD_GOLD: 5\nREQUIRED_LEVEL: 2\nPREREQUISITE: a\n"
+    )
+
+    quests = game_data.iter_quests(io.StringIO(text))
+    first = next(quests)
+    assert first['quest_id'] == "a"
+    assert first['reward_xp'] == 10
+    assert [q['quest_id'] for q in quests] == ["b"]
+
+    with pytest.raises(InvalidDataFormatError):
+        list(game_data.iter_items(io.StringIO("ITEM_ID: x\nCOST: free\n")))
+
+def test_data_watcher_reloads_changed_blocks(tmp_path):
+    """Test that the watcher swaps in edited data and reuses unchanged blocks"""
+    quest_file = tmp_path / "quests.txt"
+    item_file = tmp_path / "items.txt"
+    quest_file.write_text(open("data/quests.txt").read())
+    item_file.write_text(open("data/items.txt").read())
+
+    watcher = game_data.DataFileWatcher(str(quest_file), str(item_file))
+    assert watcher.check_for_updates() == True
+    assert watcher.check_for_updates() == False
+    old_items = watcher.items
+
+    item_file.write_text(item_file.read_text().replace("COST: 25\n", "COST: 30\n", 1))
+    os.utime(item_file, ns=(0, 0))
+    assert watcher.check_for_updates() == True
+
+    assert watcher.items['health_potion']['cost'] == 30
+    assert watcher.items['iron_sword'] is old_items['iron_sword']
+
+    # a broken file keeps the last good catalog
+    item_file.write_text("ITEM_ID: broken\n")
+    assert watcher.check_for_updates() == False
+    assert watcher.items['health_potion']['cost'] == 30
+    assert watcher.last_error is not None
+
+    # the error stays while the item file is broken, even if quests reload
+    quest_file.write_text(quest_file.read_text() + "\n")
+    assert watcher.check_for_updates() == True
+    assert watcher.last_error is not None
+
+    item_file.write_text(open("data/items.txt").read())
+    assert watcher.check_for_updates() == True
+    assert watcher.last_error is None
+
+def test_seeded_data_watcher_skips_startup_parse(tmp_path):
+    """Test that a seeded watcher keeps the loaded catalog until a file changes"""
+    quest_file = tmp_path / "quests.txt"
+    item_file = tmp_path / "items.txt"
+    quest_file.write_text(open("data/quests.txt").read())
+    item_file.write_text(open("data/items.txt").read())
+
+    watcher = game_data.DataFileWatcher(str(quest_file), str(item_file))
+    stamps = watcher.current_stamps()
+    quests = game_data.load_quests(str(quest_file))
+    items = game_data.load_items(str(item_file))
+    watcher.seed(quests, items, stamps)
+
+    assert watcher.check_for_updates() == False
+    assert watcher.quests is quests
+
+    item_file.write_text(item_file.read_text().replace("COST: 25\n", "COST: 30\n", 1))
+    os.utime(item_file, ns=(0, 0))
+    assert watcher.check_for_updates() == True
+    assert watcher.items['health_potion']['cost'] == 30
+    assert watcher.quests is quests
+
 def test_data_validation():
     """Test that data validation works"""
     valid_quest = {